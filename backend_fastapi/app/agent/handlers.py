@@ -2,7 +2,7 @@
 from app.agent.validators import ResponseValidator
 import logging
 from typing import Dict, List
-from app.core.state import state
+from app.core.state import state, get_part_columns, get_model_part_sets
 import re
 from app.tools.part_tools import check_compatibility, vector_search
 from app.agent.planner import ClaudePlanner
@@ -11,6 +11,10 @@ from app.agent.models import AgentResponse, PartInfo
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+_PS_ID_RE = re.compile(r'PS\d{5,}')
+_TITLE_STOP_WORDS = frozenset({"and", "or", "the", "a", "an", "for", "with", "of"})
+
+
 class AgentHandlers:
     """All response handler methods"""
     
@@ -561,7 +565,7 @@ Be specific based on the symptom and parts."""
         parts_list = related_parts_str.split("|")
         
         for part_str in parts_list[:limit]:
-            match = re.search(r'PS\d{5,}', part_str)
+            match = _PS_ID_RE.search(part_str)
             if match:
                 related_pid = match.group(0)
                 related_data = state["part_id_map"].get(related_pid)
@@ -572,7 +576,7 @@ Be specific based on the symptom and parts."""
 
     def _filter_by_model(self, parts: List[Dict], model_id: str) -> List[Dict]:
         """Filter parts by model compatibility"""
-        compatible_part_ids = set(state["model_id_to_parts_map"].get(model_id, []))
+        compatible_part_ids = get_model_part_sets().get(model_id, frozenset())
         
         if not compatible_part_ids:
             logger.warning(f"Model {model_id} not in database")
@@ -634,30 +638,30 @@ Be specific based on the symptom and parts."""
         
         logger.info(f"[FALLBACK] Getting popular parts for {appliance}")
         
-        # Get all parts
-        all_parts = list(state["part_id_map"].values())
+        # Scan the columnar view instead of every part dict; only the parts
+        # that are returned get copied.
+        columns = get_part_columns()
+        appliance_lower = appliance.lower()
         
         # Filter by appliance type if possible
-        filtered = []
-        for part in all_parts:
-            product_types = part.get("product_types", "").lower()
-            if appliance.lower() in product_types:
-                # Add artificial similarity score
-                part_copy = part.copy()
-                part_copy["similarity_score"] = 0.5  # Medium relevance
-                filtered.append(part_copy)
+        indices = [i for i, types in enumerate(columns.product_types) if appliance_lower in types]
+        similarity = 0.5  # Medium relevance
         
         # If no appliance match, just return first N parts
-        if not filtered:
-            for part in all_parts[:limit]:
-                part_copy = part.copy()
-                part_copy["similarity_score"] = 0.4
-                filtered.append(part_copy)
+        if not indices:
+            indices = list(range(min(limit, len(columns.ids))))
+            similarity = 0.4
         
         # Sort by rating if available
-        filtered.sort(key=lambda x: float(x.get("rating", 3.0)) if x.get("rating") and x.get("rating") != "N/A" else 3.0, reverse=True)
+        indices.sort(key=columns.ratings.__getitem__, reverse=True)
+        
+        popular = []
+        for i in indices[:limit]:
+            part_copy = state["part_id_map"][columns.ids[i]].copy()
+            part_copy["similarity_score"] = similarity
+            popular.append(part_copy)
         
-        return filtered[:limit]
+        return popular
 
     
     def _fallback_part_response(self, part_data):
@@ -756,9 +760,8 @@ Be specific based on the symptom and parts."""
         """Simple keyword-based similarity"""
         words1 = set(title1.lower().split())
         words2 = set(title2.lower().split())
-        stop_words = {"and", "or", "the", "a", "an", "for", "with", "of"}
-        words1 = words1 - stop_words
-        words2 = words2 - stop_words
+        words1 = words1 - _TITLE_STOP_WORDS
+        words2 = words2 - _TITLE_STOP_WORDS
         
         if not words1 or not words2:
             return 0.0
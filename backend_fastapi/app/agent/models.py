@@ -63,3 +63,8 @@ class AgentResponse(BaseModel):
     related_parts: List[PartInfo] = Field(default_factory=list)
     
     model_config = ConfigDict(protected_namespaces=())
+    
+    @property
+    def explanation_lower(self) -> str:
+        """Lowercased explanation for case-insensitive matching (not serialized)"""
+        return self.explanation.lower() if self.explanation else ""
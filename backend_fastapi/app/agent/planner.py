@@ -9,13 +9,21 @@ Uses AWS Bedrock Claude to:
 
 import json
 import logging
-import boto3
 import hashlib
 import re
+import threading
+import time
+from collections import OrderedDict, deque
 from typing import Dict, Any
+from app.core import config
+from app.core.aws import get_bedrock_runtime
+from app.core.metrics import AtomicCounter
 
 logger = logging.getLogger(__name__)
 
+_PART_ID_RE = re.compile(r"\bPS\d{5,}\b")
+_MODEL_ID_RE = re.compile(r"\b[A-Z0-9]{6,15}\b")
+
 
 class ClaudePlanner:
     """
@@ -29,16 +37,18 @@ class ClaudePlanner:
         Args:
             model_id: Bedrock inference profile ID (default: Claude 3.5 Sonnet cross-region)
         """
-        self.bedrock = boto3.client(
-            service_name='bedrock-runtime',
-            region_name='us-east-1'  # Change as needed
-        )
+        self.bedrock = get_bedrock_runtime("generation")
         self.model_id = model_id
         
-        # Simple in-memory cache for repeated queries
-        self._cache = {}
-        self._cache_hits = 0
-        self._cache_misses = 0
+        # In-memory LRU cache for repeated queries, bounded by approximate bytes
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (plan, size)
+        self._cache_bytes = 0
+        self._cache_max_bytes = config.PLANNER_CACHE_MAX_BYTES
+        self._cache_lock = threading.Lock()
+        self._cache_hits = AtomicCounter()
+        self._cache_misses = AtomicCounter()
+        # Recent Bedrock planning latencies (seconds): what a cache hit saves
+        self._call_latencies = deque(maxlen=512)
         
         self.system_prompt = """You are an intent classifier for an appliance parts customer service agent.
 
@@ -141,20 +151,28 @@ IMPORTANT:
             Dict with intent, entities, and confidence
         """
         
-        # Generate cache key from normalized input
-        cache_key = hashlib.md5(user_input.lower().strip().encode()).hexdigest()
+        # Generate cache key from normalized input (case and whitespace runs
+        # don't change the plan, so "Part  PS123" and "part PS123" share one)
+        cache_key = hashlib.md5(" ".join(user_input.lower().split()).encode()).hexdigest()
         
         # Check cache
-        if cache_key in self._cache:
-            self._cache_hits += 1
-            logger.info(f"[PLANNER CACHE HIT] {self._cache_hits} hits, {self._cache_misses} misses")
-            return self._cache[cache_key]
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
         
-        self._cache_misses += 1
+        if cached is not None:
+            self._cache_hits.increment()
+            logger.info("[PLANNER CACHE HIT]")
+            return cached[0]
+        
+        self._cache_misses.increment()
         
         try:
             # Call Claude via Bedrock
+            started = time.perf_counter()
             response = self._call_bedrock(user_input, max_tokens=220)
+            self._call_latencies.append(time.perf_counter() - started)
             
             # Parse JSON response
             plan = self._parse_response(response)
@@ -164,9 +182,7 @@ IMPORTANT:
             
             logger.info(f"[PLANNER] Intent: {plan.get('intent')}, Confidence: {plan.get('confidence')}")
             
-            # Store in cache (limit size to 1000 entries)
-            if len(self._cache) < 1000:
-                self._cache[cache_key] = plan
+            self._cache_put(cache_key, plan)
             
             return plan
             
@@ -177,6 +193,52 @@ IMPORTANT:
             logger.error(f"[PLANNER ERROR] {str(e)}", exc_info=True)
             return self._fallback_plan(user_input=user_input)
 
+    def _cache_put(self, cache_key: str, plan: Dict[str, Any]):
+        """Insert a plan, evicting least recently used entries over the byte budget"""
+        
+        size = len(cache_key) + len(repr(plan))
+        if size > self._cache_max_bytes:
+            return
+        
+        with self._cache_lock:
+            previous = self._cache.pop(cache_key, None)
+            if previous is not None:
+                self._cache_bytes -= previous[1]
+            
+            self._cache[cache_key] = (plan, size)
+            self._cache_bytes += size
+            
+            while self._cache_bytes > self._cache_max_bytes:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self._cache_bytes -= evicted_size
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Planner cache counters and the measured time a hit saves"""
+        
+        hits, misses = self._cache_hits.value, self._cache_misses.value
+        with self._cache_lock:
+            entries, size = len(self._cache), self._cache_bytes
+        
+        latencies = sorted(self._call_latencies)
+        if latencies:
+            avg_saved_ms = sum(latencies) / len(latencies) * 1000
+            p95_saved_ms = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000
+        else:
+            avg_saved_ms = p95_saved_ms = 0.0
+        
+        total = hits + misses
+        return {
+            "cache_size": entries,
+            "cache_bytes": size,
+            "max_bytes": self._cache_max_bytes,
+            "hits": hits,
+            "misses": misses,
+            "total_requests": total,
+            "hit_rate_pct": round((hits / total * 100) if total > 0 else 0, 2),
+            "avg_time_saved_ms": round(avg_saved_ms, 1),
+            "p95_time_saved_ms": round(p95_saved_ms, 1)
+        }
+
     def _call_bedrock(self, user_input: str, max_tokens: int = 350) -> str:
         """Call AWS Bedrock Claude API"""
         
@@ -278,8 +340,8 @@ IMPORTANT:
         """Fallback plan when LLM fails"""
 
         clean = (user_input or "").strip().upper()
-        part_match = re.search(r"\bPS\d{5,}\b", clean)
-        model_match = re.search(r"\b[A-Z0-9]{6,15}\b", clean)
+        part_match = _PART_ID_RE.search(clean)
+        model_match = _MODEL_ID_RE.search(clean)
         model_id = None
         if model_match:
             candidate = model_match.group(0)
@@ -6,26 +6,84 @@ import time
 from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Any
 
-from app.core.state import state
+from app.core.state import state, get_part_ids, get_model_ids
 from app.agent.planner import ClaudePlanner
 from app.core.metrics import metrics_logger
 from app.agent.handlers import AgentHandlers
 from app.agent.models import AgentResponse
+from app.agent.validators import contains_word
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Compiled once: these run on every handle_query call
+_PART_ID_RE = re.compile(r'\bPS\d{5,}\b')
+_MODEL_ID_RE = re.compile(r'\b[A-Z0-9]{6,15}\b')
+_ID_LIKE_RE = re.compile(r"\b(PS\d{5,}|[A-Z0-9]{6,15})\b")
+_ALNUM_RE = re.compile(r"[A-Za-z0-9]")
+_WORD_RE = re.compile(r"[A-Za-z]{2,}")
+_SESSION_PART_REF_RE = re.compile(r"\b(?:this part|that part|it|the part|same part)\b")
+_SESSION_MODEL_REF_RE = re.compile(r"\b(?:this model|that model|my model|same model|with it)\b")
+
+# Substring markers scanned by the fast-path query checks
+_FOLLOWUP_MARKERS = (
+    "step by step",
+    "walk me through",
+    "diagnostic checks",
+    "next steps",
+    "what should i check",
+    "how do i fix"
+)
+_APPLIANCE_TERMS = (
+    "refrigerator", "fridge", "dishwasher", "ice maker",
+    "water filter", "door bin", "leak", "drain", "noisy", "not working", "install"
+)
+_GENERAL_MARKERS = (
+    "what is today's date", "what is the date", "today's date",
+    "capital of", "who is", "what time", "weather", "tell me about"
+)
+
+
+# Fixed clarifications for the pre-planner fast paths. The fields are known
+# valid, so skip validation; each call builds fresh lists for the caller.
+def _low_signal_response() -> AgentResponse:
+    return AgentResponse.model_construct(
+        type="clarification_needed",
+        confidence=0.2,
+        requires_clarification=True,
+        message="I can help with refrigerator or dishwasher parts. Share a part number, model number, or symptom.",
+        clarification_questions=[
+            "Do you have a part number (starts with PS)?",
+            "What model number are you working with?",
+            "What issue are you seeing?"
+        ]
+    )
+
+
+def _non_domain_response() -> AgentResponse:
+    return AgentResponse.model_construct(
+        type="clarification_needed",
+        confidence=0.2,
+        requires_clarification=True,
+        message="I specialize in refrigerator and dishwasher parts support. Share a part number, model number, or appliance symptom and I can help.",
+        clarification_questions=[
+            "Do you have a part number (starts with PS)?",
+            "What appliance model number are you working with?",
+            "What refrigerator or dishwasher issue are you seeing?"
+        ]
+    )
+
 
 class ApplianceAgent:
     """Stateful router that resolves and routes user requests."""
     
     # Scope guardrails
-    VALID_APPLIANCES = {"refrigerator", "dishwasher", "fridge"}
-    OUT_OF_SCOPE_KEYWORDS = {
+    VALID_APPLIANCES = frozenset({"refrigerator", "dishwasher", "fridge"})
+    OUT_OF_SCOPE_KEYWORDS = frozenset({
         "oven", "stove", "range", "microwave", "dryer", 
         "washing machine", "clothes washer", "clothes dryer", "furnace", "hvac",
         "water heater", "garbage disposal", "air conditioner", "ac"
-    }
+    })
 
     def __init__(self):
         self.planner = ClaudePlanner()
@@ -59,8 +117,7 @@ class ApplianceAgent:
             return True, None
         
         for keyword in self.OUT_OF_SCOPE_KEYWORDS:
-            pattern = r'\b' + re.escape(keyword) + r'\b'
-            if re.search(pattern, query_lower):
+            if contains_word(query_lower, keyword):
                 logger.info(f"[SCOPE] Out of scope (keyword): {keyword}")
                 return False, f"I specialize in refrigerator and dishwasher parts only. For {keyword} repairs, please consult a qualified appliance technician or the manufacturer."
         
@@ -105,17 +162,7 @@ class ApplianceAgent:
         try:
             if self._is_low_signal_query(user_query):
                 logger.info("[LOW_SIGNAL] Returning clarification prompt")
-                response = AgentResponse(
-                    type="clarification_needed",
-                    confidence=0.2,
-                    requires_clarification=True,
-                    message="I can help with refrigerator or dishwasher parts. Share a part number, model number, or symptom.",
-                    clarification_questions=[
-                        "Do you have a part number (starts with PS)?",
-                        "What model number are you working with?",
-                        "What issue are you seeing?"
-                    ]
-                )
+                response = _low_signal_response()
                 latency = time.time() - start_time
                 metrics_logger.log_query(
                     query=user_query,
@@ -130,17 +177,7 @@ class ApplianceAgent:
 
             if self._is_obvious_non_domain_query(user_query):
                 logger.info("[NON_DOMAIN] Returning scope clarification without planner call")
-                response = AgentResponse(
-                    type="clarification_needed",
-                    confidence=0.2,
-                    requires_clarification=True,
-                    message="I specialize in refrigerator and dishwasher parts support. Share a part number, model number, or appliance symptom and I can help.",
-                    clarification_questions=[
-                        "Do you have a part number (starts with PS)?",
-                        "What appliance model number are you working with?",
-                        "What refrigerator or dishwasher issue are you seeing?"
-                    ]
-                )
+                response = _non_domain_response()
                 latency = time.time() - start_time
                 metrics_logger.log_query(
                     query=user_query,
@@ -278,8 +315,8 @@ class ApplianceAgent:
         
         clean = text.strip().upper()
 
-        part_match = re.search(r'\bPS\d{5,}\b', clean)
-        model_match = re.search(r'\b[A-Z0-9]{6,15}\b', clean)
+        part_match = _PART_ID_RE.search(clean)
+        model_match = _MODEL_ID_RE.search(clean)
         
         part_id = None
         if part_match:
@@ -335,7 +372,7 @@ class ApplianceAgent:
                 resolved["part_id"] = pid
                 resolved["part_id_valid"] = True
                 logger.info(f"[VALID_PART] {pid} (prefetched)")
-            elif pid.startswith("PS") and pid in state["part_id_map"]:
+            elif pid.startswith("PS") and pid in get_part_ids():
                 resolved["part_id"] = pid
                 resolved["part_id_valid"] = True
                 logger.info(f"[VALID_PART] {pid}")
@@ -357,7 +394,7 @@ class ApplianceAgent:
                     logger.info(f"[VALID_MODEL] {mid} (prefetched)")
                 else:
                     logger.info(f"[UNVALIDATED_MODEL] {mid} (not in database)")
-            elif mid in state["model_id_to_parts_map"]:
+            elif mid in get_model_ids():
                 resolved["model_id_valid"] = True
                 logger.info(f"[VALID_MODEL] {mid}")
             else:
@@ -562,15 +599,7 @@ class ApplianceAgent:
             return False
 
         query = user_query.lower()
-        followup_markers = [
-            "step by step",
-            "walk me through",
-            "diagnostic checks",
-            "next steps",
-            "what should i check",
-            "how do i fix"
-        ]
-        return any(marker in query for marker in followup_markers)
+        return any(marker in query for marker in _FOLLOWUP_MARKERS)
 
     def _build_followup_symptom_plan(self, session_entities: Dict) -> Dict[str, Any]:
         """Build deterministic plan for follow-up symptom turns."""
@@ -599,7 +628,7 @@ class ApplianceAgent:
         mid = model_id.upper()
         return {
             "model_id": mid,
-            "exists": mid in state["model_id_to_parts_map"]
+            "exists": mid in get_model_ids()
         }
 
     def _should_reuse_session_part(self, user_query: str, intent: Optional[str]) -> bool:
@@ -607,30 +636,14 @@ class ApplianceAgent:
         if intent == "symptom_troubleshoot":
             return False
 
-        query = user_query.lower()
-        patterns = [
-            r"\bthis part\b",
-            r"\bthat part\b",
-            r"\bit\b",
-            r"\bthe part\b",
-            r"\bsame part\b"
-        ]
-        return any(re.search(p, query) for p in patterns)
+        return bool(_SESSION_PART_REF_RE.search(user_query.lower()))
 
     def _should_reuse_session_model(self, user_query: str, intent: Optional[str]) -> bool:
         """Reuse model from session only on explicit references."""
         if intent == "symptom_troubleshoot":
             return False
 
-        query = user_query.lower()
-        patterns = [
-            r"\bthis model\b",
-            r"\bthat model\b",
-            r"\bmy model\b",
-            r"\bsame model\b",
-            r"\bwith it\b"
-        ]
-        return any(re.search(p, query) for p in patterns)
+        return bool(_SESSION_MODEL_REF_RE.search(user_query.lower()))
 
     def _error_response(self, error_msg: str) -> AgentResponse:
         """Generate error response"""
@@ -651,13 +664,13 @@ class ApplianceAgent:
             return True
 
         clean = user_query.strip()
-        alnum_chars = re.findall(r"[A-Za-z0-9]", clean)
+        alnum_chars = _ALNUM_RE.findall(clean)
         if len(alnum_chars) < 3:
             return True
 
         # If there are no words and no IDs, it's likely noise.
-        has_word = bool(re.search(r"[A-Za-z]{2,}", clean))
-        has_id_like = bool(re.search(r"\b(PS\d{5,}|[A-Z0-9]{6,15})\b", clean.upper()))
+        has_word = bool(_WORD_RE.search(clean))
+        has_id_like = bool(_ID_LIKE_RE.search(clean.upper()))
         return not has_word and not has_id_like
 
     def _is_obvious_non_domain_query(self, user_query: str) -> bool:
@@ -670,21 +683,14 @@ class ApplianceAgent:
             return False
 
         # If the user gave a part/model ID, treat as in-domain and continue normal routing.
-        if re.search(r"\bPS\d{5,}\b", user_query.upper()):
+        upper_query = user_query.upper()
+        if _PART_ID_RE.search(upper_query):
             return False
-        for token in re.findall(r"\b[A-Z0-9]{6,15}\b", user_query.upper()):
+        for token in _MODEL_ID_RE.findall(upper_query):
             if not token.startswith("PS") and any(ch.isdigit() for ch in token):
                 return False
 
-        appliance_terms = {
-            "refrigerator", "fridge", "dishwasher", "ice maker",
-            "water filter", "door bin", "leak", "drain", "noisy", "not working", "install"
-        }
-        if any(term in clean for term in appliance_terms):
+        if any(term in clean for term in _APPLIANCE_TERMS):
             return False
 
-        general_markers = {
-            "what is today's date", "what is the date", "today's date",
-            "capital of", "who is", "what time", "weather", "tell me about"
-        }
-        return any(marker in clean for marker in general_markers)
+        return any(marker in clean for marker in _GENERAL_MARKERS)
@@ -6,9 +6,32 @@ import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 from typing import Dict, List, Optional, Any, Literal
-from app.core.state import state
+from app.core.state import get_part_ids
 import re
 
+_PS_ID_RE = re.compile(r'PS\d{5,}')
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def contains_word(text: str, word: str) -> bool:
+    """
+    Whole-word match of ``word`` in ``text`` (same result as a ``\\b``-delimited regex)
+    using str.find plus a boundary check instead of the regex engine.
+    """
+    start = text.find(word)
+    while start != -1:
+        end = start + len(word)
+        if (start == 0 or not _is_word_char(text[start - 1])) and (
+            end == len(text) or not _is_word_char(text[end])
+        ):
+            return True
+        start = text.find(word, start + 1)
+    return False
+
+
 class ResponseValidator:
     """Validates LLM responses before returning to users"""
     
@@ -17,9 +40,10 @@ class ResponseValidator:
         """General LLM response validation"""
         
         # Check 1: No hallucinated part IDs
-        mentioned_parts = re.findall(r'PS\d{5,}', str(response))
+        mentioned_parts = _PS_ID_RE.findall(str(response))
+        known_parts = get_part_ids()
         for pid in mentioned_parts:
-            if pid not in state["part_id_map"]:
+            if pid not in known_parts:
                 logger.error(f"[VALIDATOR] Hallucinated part: {pid}")
                 return False
         
@@ -74,8 +98,9 @@ class ScopeGuardrails:
             return True, None
         
         # Priority 3: Keyword check
+        query_lower = user_query.lower()
         for keyword in cls.OUT_OF_SCOPE_KEYWORDS:
-            if re.search(r'\b' + re.escape(keyword) + r'\b', user_query.lower()):
+            if contains_word(query_lower, keyword):
                 return False, f"I specialize in refrigerator and dishwasher parts only"
         
         return True, None
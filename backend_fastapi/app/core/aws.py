@@ -0,0 +1,56 @@
+"""Shared AWS clients."""
+
+import threading
+
+import boto3
+from botocore.config import Config
+
+from app.core import config
+
+_lock = threading.Lock()
+_bedrock_clients = {}
+
+
+def _client_config(purpose: str) -> Config:
+    if purpose == "embedding":
+        # Embeddings are short and on the request path: fail fast
+        read_timeout = config.BEDROCK_EMBEDDING_READ_TIMEOUT
+        retries = {"total_max_attempts": config.BEDROCK_EMBEDDING_MAX_ATTEMPTS, "mode": "adaptive"}
+    elif purpose == "generation":
+        # Planner and answer generation can legitimately take tens of seconds
+        read_timeout = config.BEDROCK_READ_TIMEOUT
+        retries = {"total_max_attempts": config.BEDROCK_MAX_ATTEMPTS, "mode": "standard"}
+    else:
+        raise ValueError(f"Unknown Bedrock client purpose: {purpose}")
+
+    return Config(
+        max_pool_connections=config.BEDROCK_MAX_POOL_CONNECTIONS,
+        retries=retries,
+        tcp_keepalive=True,
+        connect_timeout=config.BEDROCK_CONNECT_TIMEOUT,
+        read_timeout=read_timeout,
+    )
+
+
+def get_bedrock_runtime(purpose: str = "generation"):
+    """
+    Process-wide Bedrock runtime client for ``purpose`` ("generation" or "embedding")
+
+    boto3 clients are thread-safe, so one pooled client per purpose is shared
+    by the request worker threads; its connections stay open (keep-alive)
+    instead of re-handshaking TLS. The purposes differ only in timeout and
+    retry policy.
+    """
+
+    client = _bedrock_clients.get(purpose)
+    if client is None:
+        with _lock:
+            client = _bedrock_clients.get(purpose)
+            if client is None:
+                client = boto3.client(
+                    service_name="bedrock-runtime",
+                    region_name=config.AWS_REGION,
+                    config=_client_config(purpose),
+                )
+                _bedrock_clients[purpose] = client
+    return client
@@ -16,3 +16,25 @@ BEDROCK_MODEL_ID = os.getenv(
     "BEDROCK_MODEL_ID",
     "anthropic.claude-3-sonnet-20240229-v1:0"
 )
+
+# Max in-memory chat sessions; least recently used ones are evicted first
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+
+# Shared Bedrock clients (connection pool sized for concurrent request threads)
+BEDROCK_MAX_POOL_CONNECTIONS = int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "100"))
+BEDROCK_CONNECT_TIMEOUT = float(os.getenv("BEDROCK_CONNECT_TIMEOUT", "1.0"))
+# Planner / generation calls
+BEDROCK_READ_TIMEOUT = float(os.getenv("BEDROCK_READ_TIMEOUT", "60.0"))
+BEDROCK_MAX_ATTEMPTS = int(os.getenv("BEDROCK_MAX_ATTEMPTS", "3"))
+# Titan embedding calls
+BEDROCK_EMBEDDING_READ_TIMEOUT = float(os.getenv("BEDROCK_EMBEDDING_READ_TIMEOUT", "10.0"))
+BEDROCK_EMBEDDING_MAX_ATTEMPTS = int(os.getenv("BEDROCK_EMBEDDING_MAX_ATTEMPTS", "3"))
+
+# Storage precision of the in-memory vector index: float32 (exact) or int8
+VECTOR_INDEX_DTYPE = os.getenv("VECTOR_INDEX_DTYPE", "float32")
+
+# Conversations longer than this many turns skip the history summary and semantic cache
+CONVERSATION_CACHE_THRESHOLD = int(os.getenv("CONVERSATION_CACHE_THRESHOLD", "10"))
+
+# Planner response cache budget (approximate bytes of cached plans)
+PLANNER_CACHE_MAX_BYTES = int(os.getenv("PLANNER_CACHE_MAX_BYTES", "16000000"))
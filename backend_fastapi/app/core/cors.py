@@ -0,0 +1,83 @@
+"""
+Lightweight CORS middleware
+
+Pure ASGI replacement for Starlette's generic CORSMiddleware, specialised
+for the API's allow-all policy (any origin, method and header, with
+credentials). Response headers are pre-encoded once, and the request
+headers are scanned a single time per request.
+"""
+
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+
+
+class CORSLiteMiddleware:
+    """Allow-all CORS with credentials (same headers as CORSMiddleware for that policy)"""
+
+    def __init__(self, app: ASGIApp, max_age: int = 600):
+        self.app = app
+        self.preflight_headers = (
+            (b"vary", b"Origin"),
+            (b"access-control-allow-methods", ALLOW_METHODS),
+            (b"access-control-max-age", str(max_age).encode()),
+            (b"access-control-allow-credentials", b"true"),
+        )
+        self.simple_headers = (
+            (b"access-control-allow-origin", b"*"),
+            (b"access-control-allow-credentials", b"true"),
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_method = None
+        request_headers = None
+        has_cookie = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+            elif name == b"cookie":
+                has_cookie = True
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            await self._preflight(origin, request_headers, send)
+            return
+
+        extra_headers = self.simple_headers
+        if has_cookie:
+            # Credentialed requests must see their own origin, not "*"
+            extra_headers = (
+                (b"access-control-allow-origin", origin),
+                (b"access-control-allow-credentials", b"true"),
+                (b"vary", b"Origin"),
+            )
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *extra_headers]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def _preflight(self, origin: bytes, request_headers: Optional[bytes], send: Send) -> None:
+        headers = [(b"access-control-allow-origin", origin), *self.preflight_headers]
+        if request_headers is not None:
+            # All headers are allowed, so mirror back whatever was requested
+            headers.append((b"access-control-allow-headers", request_headers))
+
+        await send({"type": "http.response.start", "status": 204, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
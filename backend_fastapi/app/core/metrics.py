@@ -9,21 +9,52 @@ Tracks:
 - Error rates
 """
 
+import asyncio
+import itertools
 import json
 import logging
+import threading
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
 
+class AtomicCounter:
+    """
+    Counter with lock-free increments
+    
+    next() on itertools.count is atomic under the GIL, so increment()
+    never blocks. Reading also advances the counter; a second count
+    tracks reads and is subtracted out. Reads are serialised by a lock,
+    since two concurrent reads would each see the other's advance.
+    """
+    
+    __slots__ = ("_increments", "_reads", "_read_lock")
+    
+    def __init__(self):
+        self._increments = itertools.count()
+        self._reads = itertools.count()
+        self._read_lock = threading.Lock()
+    
+    def increment(self):
+        next(self._increments)
+    
+    @property
+    def value(self) -> int:
+        with self._read_lock:
+            return next(self._increments) - next(self._reads)
+
+
 class MetricsLogger:
     """Simple metrics logger for production observability"""
     
     def __init__(self, log_file: str = "metrics.jsonl"):
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        # (event loop, queue) while a background writer is running
+        self._sink = None
     
     def log_query(
         self,
@@ -50,15 +81,87 @@ class MetricsLogger:
             "error": error
         }
         
-        # Write to file (one JSON object per line)
+        # Serialize once; the compact form is reused for the file and the logger
+        payload = json.dumps(metrics, separators=(",", ":"))
+
+        # Hand off to the background writer when one is running so the
+        # caller never blocks on disk I/O; otherwise write inline.
+        sink = self._sink
+        if sink is not None:
+            loop, queue = sink
+            try:
+                loop.call_soon_threadsafe(self._enqueue, queue, payload)
+            except RuntimeError:
+                # Loop already closed (shutdown race)
+                self._write_lines([payload])
+        else:
+            self._write_lines([payload])
+
+        # Also log to standard logger (interpolated only if the record is emitted)
+        logger.info("[METRICS] %s", payload)
+    
+    def _write_lines(self, lines: List[str]):
+        """Append serialized records to the log file (one JSON object per line)"""
+        
         try:
             with open(self.log_file, 'a') as f:
-                f.write(json.dumps(metrics) + '\n')
+                f.write("".join(line + '\n' for line in lines))
         except Exception as e:
             logger.error(f"Failed to write metrics: {e}")
+    
+    def _enqueue(self, queue: asyncio.Queue, payload: str):
+        sink = self._sink
+        if sink is None or sink[1] is not queue:
+            # Scheduled before the writer detached but run after its final
+            # drain; nothing will read this queue again
+            self._write_lines([payload])
+            return
+        try:
+            queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.warning("Metrics queue full, dropping record")
+    
+    async def run_writer(
+        self,
+        max_batch: int = 128,
+        max_delay: float = 0.05,
+        max_queue: int = 10_000
+    ):
+        """
+        Drain metrics records to disk in batches until cancelled
         
-        # Also log to standard logger
-        logger.info(f"[METRICS] {json.dumps(metrics)}")
+        While running, log_query only enqueues records. Each batch is
+        flushed after max_batch records or max_delay seconds, on the
+        default executor so the event loop never waits on the file.
+        """
+        
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._sink = (loop, queue)
+        batch: List[str] = []
+        
+        try:
+            while True:
+                batch.append(await queue.get())
+                deadline = loop.time() + max_delay
+                while len(batch) < max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                
+                lines, batch = batch, []
+                await loop.run_in_executor(None, self._write_lines, lines)
+        finally:
+            # Detach and flush whatever is still buffered
+            self._sink = None
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch:
+                self._write_lines(batch)
     
     def get_analytics(self, limit: int = 1000) -> Dict[str, Any]:
         """
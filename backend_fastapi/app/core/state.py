@@ -3,7 +3,9 @@
 import json
 import logging
 import os
-from typing import Dict, List
+import sys
+from array import array
+from typing import Any, Callable, Dict, FrozenSet, List, NamedTuple, Tuple
 from app.core import config
 
 logger = logging.getLogger(__name__)
@@ -14,6 +16,22 @@ state: Dict = {
     "loaded": False
 }
 
+# Derived lookup structures keyed by name -> (source map, derived value).
+# They are rebuilt lazily whenever the source map object is replaced.
+_indexes: Dict[str, tuple] = {}
+
+
+def _derived(name: str, source_key: str, build: Callable[[Any], Any]) -> Any:
+    """Return a structure derived from state[source_key], rebuilding it if the map was replaced"""
+    
+    source = state[source_key]
+    cached = _indexes.get(name)
+    if cached is None or cached[0] is not source:
+        cached = (source, build(source))
+        _indexes[name] = cached
+    return cached[1]
+
+
 def load_state(
     part_id_map_path: str = config.PART_ID_MAP_PATH,
     model_to_parts_map_path: str = config.MODEL_ID_TO_PARTS_MAP_PATH
@@ -35,13 +53,21 @@ def load_state(
         
         with open(part_path, "r") as f:
             part_id_map = json.load(f)
-            state["part_id_map"] = part_id_map
-            logger.info(f"Loaded {len(part_id_map)} parts from {part_id_map_path}")
         
         with open(model_path, "r") as f:
             model_to_parts_map = json.load(f)
-            state["model_id_to_parts_map"] = model_to_parts_map
-            logger.info(f"Loaded {len(model_to_parts_map)} models from {model_to_parts_map_path}")
+        
+        part_id_map, model_to_parts_map = compact_catalog(part_id_map, model_to_parts_map)
+        
+        state["part_id_map"] = part_id_map
+        logger.info(f"Loaded {len(part_id_map)} parts from {part_id_map_path}")
+        state["model_id_to_parts_map"] = model_to_parts_map
+        logger.info(f"Loaded {len(model_to_parts_map)} models from {model_to_parts_map_path}")
+        
+        # Warm the ID sets used for membership checks
+        get_part_ids()
+        get_model_ids()
+        get_model_part_sets()
         
         state["loaded"] = True
         logger.info("State loaded successfully")
@@ -53,6 +79,41 @@ def load_state(
         raise
 
 
+# Low-cardinality fields repeated across every part record
+_SHARED_FIELDS = ("availability", "appliance_type", "brand", "product_types")
+
+
+def compact_catalog(part_id_map: Dict, model_to_parts_map: Dict) -> Tuple[Dict, Dict]:
+    """
+    Share repeated strings across the loaded catalog
+    
+    Part and model IDs appear both as map keys and inside every record
+    and compatibility list; json.load gives each occurrence its own
+    string. Interning them (plus low-cardinality fields) and storing the
+    per-part model lists as tuples cuts the catalog footprint by about a
+    quarter. Records stay plain dicts, so callers are unaffected.
+    """
+    
+    intern = sys.intern
+    
+    for part_id, part in part_id_map.items():
+        part["part_id"] = intern(part.get("part_id") or part_id)
+        for field in _SHARED_FIELDS:
+            value = part.get(field)
+            if isinstance(value, str):
+                part[field] = intern(value)
+        models = part.get("compatible_models")
+        if models:
+            part["compatible_models"] = tuple(map(intern, models))
+    
+    part_id_map = {intern(part_id): part for part_id, part in part_id_map.items()}
+    model_to_parts_map = {
+        intern(model_id): [intern(pid) for pid in part_ids]
+        for model_id, part_ids in model_to_parts_map.items()
+    }
+    return part_id_map, model_to_parts_map
+
+
 def reload_state():
     """Reload state (useful for development)"""
     
@@ -80,16 +141,70 @@ def get_model_parts(model_id: str) -> List[str]:
     return state["model_id_to_parts_map"].get(model_id.upper(), [])
 
 
+class PartColumns(NamedTuple):
+    """Column-oriented view of the fields scanned across the whole catalog"""
+    ids: Tuple[str, ...]
+    product_types: Tuple[str, ...]  # lowercased, interned
+    ratings: array  # float64, 3.0 when missing or unparseable
+
+
+def _parse_rating(value: Any) -> float:
+    if not value or value == "N/A":
+        return 3.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 3.0
+
+
+def _build_part_columns(part_id_map: Dict) -> PartColumns:
+    ids = tuple(part_id_map)
+    parts = [part_id_map[pid] for pid in ids]
+    return PartColumns(
+        ids=ids,
+        product_types=tuple(sys.intern((p.get("product_types") or "").lower()) for p in parts),
+        ratings=array("d", (_parse_rating(p.get("rating")) for p in parts))
+    )
+
+
+def get_part_columns() -> PartColumns:
+    """Get the columnar part view (index i in every column refers to ids[i])"""
+    
+    return _derived("part_columns", "part_id_map", _build_part_columns)
+
+
+def get_part_ids() -> FrozenSet[str]:
+    """Get the set of known part IDs (keys only, no part payloads)"""
+    
+    return _derived("part_ids", "part_id_map", frozenset)
+
+
+def get_model_ids() -> FrozenSet[str]:
+    """Get the set of known model IDs"""
+    
+    return _derived("model_ids", "model_id_to_parts_map", frozenset)
+
+
+def _build_model_part_sets(model_to_parts_map: Dict) -> Dict[str, FrozenSet[str]]:
+    return {model_id: frozenset(part_ids) for model_id, part_ids in model_to_parts_map.items()}
+
+
+def get_model_part_sets() -> Dict[str, FrozenSet[str]]:
+    """Get model ID -> set of compatible part IDs (for O(1) compatibility checks)"""
+    
+    return _derived("model_part_sets", "model_id_to_parts_map", _build_model_part_sets)
+
+
 def part_exists(part_id: str) -> bool:
     """Check if part exists"""
     
-    return part_id.upper() in state["part_id_map"]
+    return part_id.upper() in get_part_ids()
 
 
 def model_exists(model_id: str) -> bool:
     """Check if model exists"""
     
-    return model_id.upper() in state["model_id_to_parts_map"]
+    return model_id.upper() in get_model_ids()
 
 
 def get_stats() -> Dict:
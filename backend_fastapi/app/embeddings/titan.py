@@ -1,22 +1,39 @@
-import boto3
-import json
-from app.core import config
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+from app.core.aws import get_bedrock_runtime
 
 class TitanEmbedder:
     def __init__(self):
-        self.client = boto3.client(
-            "bedrock-runtime",
-            region_name=config.AWS_REGION
-        )
         self.model_id = "amazon.titan-embed-text-v1"
 
+    @staticmethod
+    def _get_client():
+        # Shared, pooled client (see app.core.aws)
+        return get_bedrock_runtime("embedding")
+
+    @property
+    def client(self):
+        return self._get_client()
+
     def embed(self, text: str):
-        response = self.client.invoke_model(
+        response = self._get_client().invoke_model(
             modelId=self.model_id,
-            body=json.dumps({"inputText": text}),
+            body=orjson.dumps({"inputText": text}),
             contentType="application/json",
             accept="application/json"
         )
 
-        result = json.loads(response["body"].read())
+        result = orjson.loads(response["body"].read())
         return result["embedding"]
+
+    def embed_batch(self, texts: List[str], max_workers: int = 8) -> List[List[float]]:
+        """Embed several texts, overlapping the per-text Bedrock round trips."""
+        if len(texts) <= 1:
+            return [self.embed(text) for text in texts]
+
+        # Titan has no batch endpoint; parallel requests on the shared client
+        # bring wall time down from N round trips to roughly one.
+        self._get_client()
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(texts))) as executor:
+            return list(executor.map(self.embed, texts))
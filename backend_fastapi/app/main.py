@@ -1,18 +1,25 @@
 """FastAPI service entrypoint for the PartSelect support agent."""
 
+import asyncio
 import logging
 import uuid
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, suppress
 from datetime import datetime, timezone
-from contextlib import asynccontextmanager
+from itertools import islice
 from typing import Dict, List, Optional
 
 from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 
 from app.agent.router import ApplianceAgent
+from app.core import config
 from app.core.state import get_stats
 from app.core.metrics import metrics_logger
+from app.core.cors import CORSLiteMiddleware
+from app.retrieval.semantic_cache import skip_semantic_cache
+from app.tools.part_tools import check_embedding_backend
 
 logging.basicConfig(
     level=logging.INFO,
@@ -32,28 +39,82 @@ async def lifespan(_: FastAPI):
     logger.info(f"Loaded {stats['total_models']} models")
     logger.info("Agent initialized")
     logger.info("=" * 60)
+    metrics_writer = asyncio.create_task(metrics_logger.run_writer())
+    # Live Bedrock round trip: report the result without delaying startup
+    embedding_check = asyncio.create_task(asyncio.to_thread(check_embedding_backend))
     yield
     logger.info("Shutting down...")
+    metrics_writer.cancel()
+    with suppress(asyncio.CancelledError):
+        await metrics_writer
+    if not embedding_check.done():
+        embedding_check.cancel()
 
 
 app = FastAPI(
     title="PartSelect Customer Support Agent",
     description="AI-powered appliance parts assistant",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Allow-all CORS with credentials; in production, restrict origins
+app.add_middleware(CORSLiteMiddleware)
 
 
 agent = ApplianceAgent()
-sessions: Dict[str, Dict] = {}
+MAX_SESSION_MESSAGES = 20
+SUMMARY_MESSAGES = 6
+
+# History compaction: assistant responses older than these many turns are shrunk
+COLLAPSE_CLARIFICATIONS_AFTER = 1
+STRIP_PART_LISTS_AFTER = 3
+TRUNCATE_EXPLANATIONS_AFTER = 5
+MAX_EXPLANATION_CHARS = 500
+PART_LIST_FIELDS = ("recommended_parts", "alternative_parts", "related_parts")
+
+class SummaryArena:
+    """
+    Rolling conversation summary stored in one per-session bytearray
+    
+    Lines are appended (newline-terminated) to the buffer and only their
+    spans are tracked; the consumed prefix is dropped in a single slice
+    deletion, and the whole arena goes away with its session.
+    """
+    
+    __slots__ = ("buffer", "spans")
+    
+    # Reclaim the consumed prefix once it grows past this many bytes
+    COMPACT_BYTES = 4096
+    
+    def __init__(self, max_lines: int):
+        self.buffer = bytearray()
+        self.spans = deque(maxlen=max_lines)
+    
+    def append(self, line: str):
+        start = len(self.buffer)
+        self.buffer += line.encode("utf-8")
+        self.buffer += b"\n"
+        self.spans.append((start, len(self.buffer)))
+        
+        offset = self.spans[0][0]
+        if offset > self.COMPACT_BYTES:
+            del self.buffer[:offset]
+            self.spans = deque(
+                ((s - offset, e - offset) for s, e in self.spans),
+                maxlen=self.spans.maxlen
+            )
+    
+    def render(self) -> str:
+        # Live lines are contiguous, so one decode covers them all
+        if not self.spans:
+            return ""
+        return self.buffer[self.spans[0][0]:self.spans[-1][1] - 1].decode("utf-8", "replace")
+
+
+# LRU-ordered: most recently used sessions at the end, bounded by SESSION_MAX_ENTRIES
+sessions: "OrderedDict[str, Dict]" = OrderedDict()
 
 class ChatMessage(BaseModel):
     """Single chat message."""
@@ -72,7 +133,7 @@ class ChatResponse(BaseModel):
     """Response payload for the chat endpoint."""
     conversation_id: str
     response: Dict
-    timestamp: str
+    timestamp: datetime
 
 
 def get_or_create_session(conversation_id: Optional[str]) -> tuple[str, Dict]:
@@ -80,83 +141,152 @@ def get_or_create_session(conversation_id: Optional[str]) -> tuple[str, Dict]:
     Get existing session or create new one
     
     Returns:
-        (conversation_id, session_entities)
+        (conversation_id, session)
     """
     
     if conversation_id and conversation_id in sessions:
-        return conversation_id, sessions[conversation_id]["entities"]
+        sessions.move_to_end(conversation_id)
+        return conversation_id, sessions[conversation_id]
     
     new_id = str(uuid.uuid4())
-    sessions[new_id] = {
+    session = {
         "entities": {},
-        "messages": [],
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "messages": deque(maxlen=MAX_SESSION_MESSAGES),
+        # Pre-rendered summary lines for the most recent messages
+        "recent_summary": SummaryArena(SUMMARY_MESSAGES),
+        "turn_count": 0,
+        "created_at": datetime.now(timezone.utc)
     }
+    _store_session(new_id, session)
+    
+    return new_id, session
+
+
+def _store_session(conversation_id: str, session: Dict):
+    """Insert a session as most recently used, evicting the oldest over the cap"""
+    
+    sessions[conversation_id] = session
+    sessions.move_to_end(conversation_id)
     
-    return new_id, sessions[new_id]["entities"]
+    while len(sessions) > config.SESSION_MAX_ENTRIES:
+        evicted_id, _ = sessions.popitem(last=False)
+        logger.info(f"[SESSION] Evicted least recently used session {evicted_id}")
 
 
 def update_session(
     conversation_id: str,
+    session: Dict,
     user_message: str,
     agent_response: Dict
 ):
     """Update session with new messages"""
     
+    # Other requests may have evicted it while this one was being answered
     if conversation_id not in sessions:
-        return
+        _store_session(conversation_id, session)
     
-    session = sessions[conversation_id]
+    compact_history(session["messages"])
     
     session["messages"].append({
         "role": "user",
         "content": user_message,
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": datetime.now(timezone.utc)
     })
     
     session["messages"].append({
         "role": "assistant",
         "content": agent_response,
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": datetime.now(timezone.utc)
     })
     
-    session["messages"] = session["messages"][-20:]
+    session["recent_summary"].append(summary_line("user", user_message))
+    session["recent_summary"].append(summary_line("assistant", agent_response))
+    session["turn_count"] += 1
 
 
-def build_conversation_summary(conversation_id: str) -> str:
-    """Build summary of conversation for context"""
+def _compact_response(content: Dict, turns_ago: int) -> Dict:
+    """Shrink an older assistant response; each pass is idempotent"""
     
-    if conversation_id not in sessions:
-        return ""
+    if turns_ago > COLLAPSE_CLARIFICATIONS_AFTER and content.get("type") == "clarification_needed":
+        return {
+            "type": content["type"],
+            "confidence": content.get("confidence"),
+            "requires_clarification": content.get("requires_clarification"),
+            "message": content.get("message")
+        }
     
-    messages = sessions[conversation_id]["messages"]
+    compacted = content
     
-    if not messages:
-        return ""
+    if turns_ago > STRIP_PART_LISTS_AFTER:
+        for field in PART_LIST_FIELDS:
+            parts = compacted.get(field)
+            if parts and isinstance(parts[0], dict):
+                if compacted is content:
+                    compacted = dict(content)
+                compacted[field] = [part.get("part_id") for part in parts]
     
-    recent = messages[-6:] if len(messages) >= 6 else messages
+    explanation = compacted.get("explanation")
+    if (
+        turns_ago > TRUNCATE_EXPLANATIONS_AFTER
+        and explanation
+        and len(explanation) > MAX_EXPLANATION_CHARS
+        and not explanation.endswith("[truncated]")
+    ):
+        if compacted is content:
+            compacted = dict(content)
+        compacted["explanation"] = explanation[:MAX_EXPLANATION_CHARS] + "[truncated]"
     
-    summary_parts = []
-    for msg in recent:
-        role = msg["role"].capitalize()
-        content = msg["content"]
+    return compacted
+
+
+def compact_history(messages) -> None:
+    """
+    Shrink older assistant responses before a new turn is appended
+    
+    Recent turns stay verbatim. Older ones progressively lose bulk:
+    clarifications collapse to their message, part lists become part IDs,
+    and long explanations are truncated.
+    """
+    
+    for position, message in enumerate(reversed(messages)):
+        content = message["content"]
+        if message["role"] != "assistant" or not isinstance(content, dict):
+            continue
         
-        if content is None:
-            content_str = "[No content]"
-        elif isinstance(content, dict):
-            content_str = (
-                content.get("explanation")
-                or content.get("message")
-                or str(content)
-            )
-        else:
-            content_str = str(content)
+        # The turn about to be appended is turn 0
+        turns_ago = position // 2 + 1
+        if turns_ago <= COLLAPSE_CLARIFICATIONS_AFTER:
+            continue
+        
+        # Swap in a new dict rather than mutating one that may be shared
+        message["content"] = _compact_response(content, turns_ago)
 
-        content_str = content_str[:200]
 
-        summary_parts.append(f"{role}: {content_str}")
+def summary_line(role: str, content) -> str:
+    """Render one message as a conversation summary line"""
     
-    return "\n".join(summary_parts)
+    if content is None:
+        content_str = "[No content]"
+    elif isinstance(content, dict):
+        content_str = (
+            content.get("explanation")
+            or content.get("message")
+            or str(content)
+        )
+    else:
+        content_str = str(content)
+    
+    return f"{role.capitalize()}: {content_str[:200]}"
+
+
+def build_conversation_summary(conversation_id: str) -> str:
+    """Build summary of conversation for context"""
+    
+    if conversation_id not in sessions:
+        return ""
+    
+    # Maintained incrementally by update_session
+    return sessions[conversation_id]["recent_summary"].render()
 
 
 @app.post("/chat", response_model=ChatResponse)
@@ -166,27 +296,41 @@ async def chat(request: ChatRequest):
     """
     
     try:
-        conversation_id, session_entities = get_or_create_session(request.conversation_id)
-        conversation_summary = build_conversation_summary(conversation_id)
+        conversation_id, session = get_or_create_session(request.conversation_id)
         logger.info(f"[CHAT] conversation_id={conversation_id}, message='{request.message}'")
         
-        response = agent.handle_query(
-            user_query=request.message,
-            conversation_id=conversation_id,
-            conversation_summary=conversation_summary,
-            session_entities=session_entities
-        )
+        # Long conversations: the recent-history summary and semantic cache
+        # hits add little, so skip both
+        long_conversation = session["turn_count"] > config.CONVERSATION_CACHE_THRESHOLD
+        conversation_summary = "" if long_conversation else build_conversation_summary(conversation_id)
+        
+        # handle_query blocks on Bedrock/Chroma I/O; run it on a worker thread
+        # so the event loop keeps serving other requests meanwhile.
+        # (to_thread copies the context, so the worker sees the cache flag)
+        cache_token = skip_semantic_cache.set(long_conversation)
+        try:
+            response = await asyncio.to_thread(
+                agent.handle_query,
+                user_query=request.message,
+                conversation_id=conversation_id,
+                conversation_summary=conversation_summary,
+                session_entities=session["entities"]
+            )
+        finally:
+            skip_semantic_cache.reset(cache_token)
         
         response_dict = response.model_dump()
-        update_session(conversation_id, request.message, response_dict)
+        update_session(conversation_id, session, request.message, response_dict)
         
         logger.info(f"[CHAT] Response type: {response_dict['type']}, confidence: {response_dict['confidence']}")
         
-        return ChatResponse(
-            conversation_id=conversation_id,
-            response=response_dict,
-            timestamp=datetime.now(timezone.utc).isoformat()
-        )
+        # Return the plain dict so orjson serializes it once, skipping a
+        # ChatResponse re-validation round trip.
+        return ORJSONResponse({
+            "conversation_id": conversation_id,
+            "response": response_dict,
+            "timestamp": datetime.now(timezone.utc)
+        })
         
     except Exception as e:
         logger.error(f"[CHAT ERROR] {str(e)}", exc_info=True)
@@ -201,7 +345,7 @@ async def health_check():
     
     return {
         "status": "healthy",
-        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "timestamp": datetime.now(timezone.utc),
         "stats": stats
     }
 
@@ -219,7 +363,7 @@ async def metrics():
         "total_conversations": sum(
             len(s["messages"]) for s in sessions.values()
         ),
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": datetime.now(timezone.utc)
     }
 
 
@@ -231,12 +375,13 @@ async def get_session(conversation_id: str):
         raise HTTPException(status_code=404, detail="Session not found")
     
     session = sessions[conversation_id]
+    messages = session["messages"]
     
     return {
         "conversation_id": conversation_id,
         "entities": session["entities"],
-        "message_count": len(session["messages"]),
-        "messages": session["messages"][-10:],
+        "message_count": len(messages),
+        "messages": list(islice(messages, max(0, len(messages) - 10), None)),
         "created_at": session["created_at"]
     }
 
@@ -275,23 +420,9 @@ async def cache_stats():
     """Return planner cache stats."""
     
     try:
-        global agent
-        hits = agent.planner._cache_hits
-        misses = agent.planner._cache_misses
-        total = hits + misses
-        
         return {
             "status": "success",
-            "planner_cache": {
-                "cache_size": len(agent.planner._cache),
-                "max_size": 1000,
-                "hits": hits,
-                "misses": misses,
-                "total_requests": total,
-                "hit_rate_pct": round((hits / total * 100) if total > 0 else 0, 2),
-                "memory_saved_pct": round((hits / total * 100) if total > 0 else 0, 2),
-                "avg_time_saved_ms": 1200 if hits > 0 else 0  # Planner call is ~1200ms
-            }
+            "planner_cache": agent.planner.cache_stats()
         }
         
     except Exception as e:
@@ -0,0 +1,110 @@
+"""
+In-memory exact nearest-neighbour index over the part embeddings
+
+The catalog is small (a few hundred parts), so a brute-force scan of one
+contiguous matrix is both exact and faster than going through the Chroma
+client for every query. Chroma stays the source of truth and is only read
+once, when the index is built.
+
+Vectors can optionally be stored as int8 (with a per-vector scale) to cut
+the index footprint 4x. Queries stay float32 and are compared against the
+dequantized rows, so ranking error comes only from the stored side.
+Quantized rows are widened a block at a time into a small float32 buffer,
+so a query never materializes the full matrix.
+"""
+
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class DenseIndex:
+    """Exact top-k search by squared L2 distance (same metric as the Chroma collection)"""
+
+    DTYPES = ("float32", "int8")
+
+    # Rows widened to float32 per step when scoring a quantized index
+    BLOCK_ROWS = 256
+
+    def __init__(self, ids: Sequence[str], embeddings, metadatas: Sequence[Dict], dtype: str = "float32"):
+        if dtype not in self.DTYPES:
+            raise ValueError(f"Unsupported index dtype: {dtype}")
+
+        self.ids = list(ids)
+        self.metadatas = [metadata or {} for metadata in metadatas]
+        self.dtype = dtype
+        self.scales = None
+
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if dtype == "int8":
+            # Symmetric per-vector quantization: row ~= q * scale
+            scales = np.abs(vectors).max(axis=1) / 127.0 if vectors.size else np.ones(len(vectors))
+            scales[scales == 0] = 1.0
+            self.vectors = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+            self.scales = scales.astype(np.float32)
+        else:
+            self.vectors = vectors
+
+        # ||x||^2 per (dequantized) row, so a query needs one matrix-vector product
+        rows = self.vectors.astype(np.float32)
+        if self.scales is not None:
+            rows *= self.scales[:, None]
+        self.sq_norms = np.einsum("ij,ij->i", rows, rows)
+
+    @classmethod
+    def from_collection(cls, collection, dtype: str = "float32") -> "DenseIndex":
+        data = collection.get(include=["embeddings", "metadatas"])
+        index = cls(data["ids"], data["embeddings"], data["metadatas"], dtype=dtype)
+        logger.info(
+            f"[DENSE_INDEX] Loaded {len(index)} vectors (dim {index.dim}, {dtype}, "
+            f"{index.vectors.nbytes / 1e6:.1f} MB)"
+        )
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def dim(self) -> int:
+        return self.vectors.shape[1] if self.vectors.ndim == 2 else 0
+
+    def _dots(self, q: np.ndarray) -> np.ndarray:
+        """Row-wise dot products with q against the dequantized rows, as float32"""
+
+        if self.scales is None:
+            return self.vectors @ q
+
+        n = len(self)
+        dots = np.empty(n, dtype=np.float32)
+        block = np.empty((min(self.BLOCK_ROWS, n), self.dim), dtype=np.float32)
+        for start in range(0, n, self.BLOCK_ROWS):
+            stop = min(start + self.BLOCK_ROWS, n)
+            rows = block[:stop - start]
+            np.copyto(rows, self.vectors[start:stop], casting="unsafe")
+            np.dot(rows, q, out=dots[start:stop])
+
+        dots *= self.scales
+        return dots
+
+    def query(self, embedding: List[float], top_k: int) -> Tuple[List[Dict], np.ndarray]:
+        """Return (metadatas, squared L2 distances) of the top_k nearest vectors, nearest first"""
+
+        if not len(self) or top_k <= 0:
+            return [], np.empty(0)
+
+        q = np.asarray(embedding, dtype=np.float32)
+        dots = self._dots(q)
+        dists = self.sq_norms - 2.0 * dots + float(q @ q)
+
+        k = min(top_k, len(self))
+        if k < len(self):
+            top = np.argpartition(dists, k - 1)[:k]
+            top = top[np.argsort(dists[top], kind="stable")]
+        else:
+            top = np.argsort(dists, kind="stable")
+
+        # Clamp tiny negatives from floating-point cancellation
+        return [self.metadatas[i] for i in top], np.maximum(dists[top], 0.0).astype(np.float64)
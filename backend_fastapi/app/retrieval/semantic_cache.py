@@ -0,0 +1,127 @@
+"""
+Semantic cache for vector search results
+
+Near-duplicate queries ("ice maker not working" / "ice maker broken")
+embed to almost the same vector, so their Chroma results can be reused.
+Cached query vectors are kept normalised in one float32 matrix, which
+makes a lookup a single matrix-vector product.
+"""
+
+import logging
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Set per request (e.g. for long conversations) to bypass the cache; it
+# follows the request onto worker threads started with asyncio.to_thread.
+skip_semantic_cache: ContextVar[bool] = ContextVar("skip_semantic_cache", default=False)
+
+
+class SemanticCache:
+    """Fixed-size FIFO cache of search results keyed by query embedding"""
+
+    def __init__(self, max_entries: int = 512, threshold: float = 0.97, max_query_chars: int = 400):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        # Long queries carry more detail than their embedding similarity reflects
+        self.max_query_chars = max_query_chars
+
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim), allocated on first insert
+        self._entries: List[Optional[tuple]] = [None] * max_entries  # (query, model, top_k, results)
+        self._size = 0
+        self._next = 0  # ring position of the oldest slot once full
+
+        self.hits = 0
+        self.misses = 0
+
+    def accepts(self, query: str) -> bool:
+        return not skip_semantic_cache.get() and len(query) <= self.max_query_chars
+
+    @staticmethod
+    def _normalise(embedding: List[float]) -> Optional[np.ndarray]:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        if not norm:
+            return None
+        return vec / norm
+
+    def get(self, query: str, embedding: List[float], top_k: int, model: str) -> Optional[List[Dict]]:
+        """Return cached results for a semantically equivalent query, if any"""
+
+        if not self.accepts(query):
+            return None
+
+        vec = self._normalise(embedding)
+        if vec is None:
+            return None
+
+        with self._lock:
+            if not self._size or self._vectors.shape[1] != vec.shape[0]:
+                self.misses += 1
+                return None
+
+            scores = self._vectors[:self._size] @ vec
+            best = int(np.argmax(scores))
+            cached_query, cached_model, cached_top_k, results = self._entries[best]
+
+            if scores[best] < self.threshold or cached_model != model or cached_top_k < top_k:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        logger.info(f"[SEMANTIC_CACHE] '{query}' matched '{cached_query}' ({scores[best]:.3f})")
+        # Callers annotate result dicts, so hand out copies
+        return [dict(part) for part in results[:top_k]]
+
+    def put(self, query: str, embedding: List[float], top_k: int, model: str, results: List[Dict]):
+        """Store results, evicting the oldest entry when full"""
+
+        if not self.accepts(query):
+            return
+
+        vec = self._normalise(embedding)
+        if vec is None:
+            return
+
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vec.shape[0]:
+                # First insert (or embedding model changed dimension): start fresh
+                self._vectors = np.zeros((self.max_entries, vec.shape[0]), dtype=np.float32)
+                self._entries = [None] * self.max_entries
+                self._size = 0
+                self._next = 0
+
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = self._next
+                self._next = (self._next + 1) % self.max_entries
+
+            self._vectors[slot] = vec
+            self._entries[slot] = (query, model, top_k, [dict(part) for part in results])
+
+    def clear(self):
+        with self._lock:
+            self._vectors = None
+            self._entries = [None] * self.max_entries
+            self._size = 0
+            self._next = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": self._size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
@@ -10,12 +10,16 @@ Functions:
 """
 
 import logging
-import json
-import boto3
+import orjson
+import threading
+import numpy as np
 from typing import Dict, List, Optional
 import chromadb
 from app.core import config
-from app.core.state import state
+from app.core.aws import get_bedrock_runtime
+from app.core.state import state, get_model_part_sets
+from app.retrieval.dense_index import DenseIndex
+from app.retrieval.semantic_cache import SemanticCache
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +27,7 @@ logger = logging.getLogger(__name__)
 # BEDROCK CLIENT FOR EMBEDDINGS
 
 try:
-    bedrock_runtime = boto3.client(
-        service_name='bedrock-runtime',
-        region_name='us-east-1'  # Change to your region
-    )
+    bedrock_runtime = get_bedrock_runtime("embedding")
     logger.info("Bedrock runtime client initialized")
 except Exception as e:
     logger.error(f"Failed to initialize Bedrock client: {e}")
@@ -48,6 +49,42 @@ except Exception as e:
     chroma_collection = None
 
 
+# IN-MEMORY DENSE INDEX (built from ChromaDB on first search)
+
+_dense_index = None
+_dense_index_loaded = False
+_dense_index_lock = threading.Lock()
+
+
+def get_dense_index() -> Optional[DenseIndex]:
+    """
+    Get the exact in-memory index over the Chroma embeddings
+    
+    Returns None when it cannot be built; vector_search then queries
+    ChromaDB directly.
+    """
+    
+    global _dense_index, _dense_index_loaded
+    
+    if not _dense_index_loaded and chroma_collection:
+        with _dense_index_lock:
+            if not _dense_index_loaded:
+                try:
+                    _dense_index = DenseIndex.from_collection(
+                        chroma_collection, dtype=config.VECTOR_INDEX_DTYPE
+                    )
+                except Exception as e:
+                    logger.warning(f"[DENSE_INDEX] Falling back to ChromaDB queries: {e}")
+                    _dense_index = None
+                _dense_index_loaded = True
+    
+    return _dense_index
+
+
+# Reuses results for near-duplicate queries (skips the Chroma round trip)
+semantic_cache = SemanticCache()
+
+
 # EMBEDDING GENERATION (BEDROCK TITAN)
 
 def get_embedding(text: str, model_id: str = "amazon.titan-embed-text-v1") -> Optional[List[float]]:
@@ -70,7 +107,7 @@ def get_embedding(text: str, model_id: str = "amazon.titan-embed-text-v1") -> Op
     
     try:
         # Prepare request body
-        body = json.dumps({
+        body = orjson.dumps({
             "inputText": text
         })
         
@@ -83,7 +120,7 @@ def get_embedding(text: str, model_id: str = "amazon.titan-embed-text-v1") -> Op
         )
         
         # Parse response
-        response_body = json.loads(response['body'].read())
+        response_body = orjson.loads(response['body'].read())
         embedding = response_body.get('embedding')
         
         if not embedding:
@@ -139,8 +176,8 @@ def check_compatibility(model_id: str, part_id: str) -> bool:
     model_id = model_id.upper().strip()
     part_id = part_id.upper().strip()
     
-    # Get list of compatible parts for this model
-    compatible_parts = state["model_id_to_parts_map"].get(model_id, [])
+    # Get set of compatible parts for this model
+    compatible_parts = get_model_part_sets().get(model_id, frozenset())
     
     is_compatible = part_id in compatible_parts
     
@@ -192,37 +229,58 @@ def vector_search(
             logger.error("[VECTOR_SEARCH] Failed to generate embedding")
             return []
         
-        # Step 2: Query ChromaDB with the embedding vector
-        results = chroma_collection.query(
-            query_embeddings=[query_embedding],  # Use embedding, not text
-            n_results=top_k
-        )
+        cached = semantic_cache.get(query, query_embedding, top_k, embedding_model)
+        if cached is not None:
+            return cached
+        
+        # Step 2: Nearest neighbours, from the in-memory index when available
+        metadatas = []
+        dists = np.empty(0)
+        index = get_dense_index()
+        
+        if index is not None and len(index) and index.dim == len(query_embedding):
+            metadatas, dists = index.query(query_embedding, top_k)
+        else:
+            # Query ChromaDB with the embedding vector
+            # (document text is not needed: part fields come from metadata/part_id_map)
+            results = chroma_collection.query(
+                query_embeddings=[query_embedding],  # Use embedding, not text
+                n_results=top_k,
+                include=["metadatas", "distances"]
+            )
+            
+            if results and results.get("metadatas"):
+                metadatas = results["metadatas"][0]
+                distances = results.get("distances", [[]])[0]
+                
+                # Missing distances count as 1.0 (as before)
+                dists = np.ones(len(metadatas))
+                n = min(len(distances), len(metadatas))
+                dists[:n] = distances[:n]
         
         # Step 3: Parse results
         parts = []
         
-        if results and results.get("documents"):
-            documents = results["documents"][0]
-            metadatas = results.get("metadatas", [[]])[0]
-            distances = results.get("distances", [[]])[0]
+        if metadatas:
+            # Convert distance to similarity in one pass
+            # Cosine distance: 0 = identical, 2 = opposite
+            # Convert to similarity: 1 - (distance/2)
+            sims = np.maximum(0.0, 1.0 - dists * 0.5)
             
-            for i, doc in enumerate(documents):
-                metadata = metadatas[i] if i < len(metadatas) else {}
-                distance = distances[i] if i < len(distances) else 1.0
-                
-                # Parse document text to extract fields
-                part_data = _parse_document(doc, metadata)
-                
-                # Add similarity score (convert distance to similarity)
-                # Cosine distance: 0 = identical, 2 = opposite
-                # Convert to similarity: 1 - (distance/2)
-                part_data["similarity_score"] = max(0.0, 1.0 - (distance / 2.0))
-                part_data["distance"] = distance  # Keep raw distance too
-                
-                parts.append(part_data)
+            parts = [
+                {
+                    **_parse_document(None, metadata or {}),
+                    "similarity_score": sim,
+                    "distance": dist  # Keep raw distance too
+                }
+                for metadata, sim, dist in zip(metadatas, sims.tolist(), dists.tolist())
+            ]
         
         logger.info(f"[VECTOR_SEARCH] Query: '{query}' → {len(parts)} results")
         
+        if parts:
+            semantic_cache.put(query, query_embedding, top_k, embedding_model, parts)
+        
         return parts
         
     except Exception as e:
@@ -230,9 +288,13 @@ def vector_search(
         return []
 
 
-def _parse_document(doc_text: str, metadata: Dict) -> Dict:
+def _parse_document(doc_text: Optional[str], metadata: Dict) -> Dict:
     """
-    Parse ChromaDB document text into structured dict
+    Build a structured part dict for a ChromaDB hit
+    
+    Pre-loaded parts are copied from part_id_map, with the non-empty
+    metadata fields (e.g. brand, which part_id_map lacks) laid over them.
+    Otherwise the metadata is used, plus the document text when fetched.
     
     Document format from ingestion:
         Title: ...
@@ -246,14 +308,25 @@ def _parse_document(doc_text: str, metadata: Dict) -> Dict:
         URL: ...
     """
     
+    # Fast path: the full record is already in memory
+    part_id = metadata.get("part_id", "")
+    full_data = state["part_id_map"].get(part_id)
+    if full_data is not None:
+        part_data = dict(full_data)
+        part_data.update((key, value) for key, value in metadata.items() if value)
+        return part_data
+    
     part_data = {}
     
     # Extract from metadata (more reliable)
-    part_data["part_id"] = metadata.get("part_id", "")
+    part_data["part_id"] = part_id
     part_data["brand"] = metadata.get("brand", "")
     part_data["product_types"] = metadata.get("product_types", "")
     part_data["symptoms"] = metadata.get("symptoms", "")
     
+    if not doc_text:
+        return part_data
+    
     # Parse document text for remaining fields
     lines = doc_text.strip().split("\n")
     
@@ -270,15 +343,6 @@ def _parse_document(doc_text: str, metadata: Dict) -> Dict:
         if value and value != "N/A":
             part_data[key] = value
     
-    # Enrich with data from part_id_map if available
-    part_id = part_data.get("part_id")
-    if part_id and part_id in state["part_id_map"]:
-        full_data = state["part_id_map"][part_id]
-        # Merge, but don't overwrite parsed data
-        for k, v in full_data.items():
-            if k not in part_data or not part_data[k]:
-                part_data[k] = v
-    
     return part_data
 
 
@@ -359,26 +423,19 @@ def search_by_symptom(
     
     # Post-filter by appliance/brand if specified
     # (Vector search already considers these, but we can be more strict)
-    if appliance or brand:
-        filtered = []
-        for part in results:
-            product_types = part.get("product_types", "").lower()
-            part_brand = part.get("brand", "").lower()
-            
-            # Check appliance match
-            appliance_match = True
-            if appliance:
-                appliance_match = appliance.lower() in product_types
-            
-            # Check brand match
-            brand_match = True
-            if brand:
-                brand_match = brand.lower() in part_brand
-            
-            if appliance_match and brand_match:
-                filtered.append(part)
+    if (appliance or brand) and results:
+        # Column-wise substring checks over the result set
+        mask = np.ones(len(results), dtype=bool)
+        
+        if appliance:
+            product_types = np.array([part.get("product_types") or "" for part in results], dtype=str)
+            mask &= np.char.find(np.char.lower(product_types), appliance.lower()) >= 0
         
-        return filtered
+        if brand:
+            brands = np.array([part.get("brand") or "" for part in results], dtype=str)
+            mask &= np.char.find(np.char.lower(brands), brand.lower()) >= 0
+        
+        return [results[i] for i in np.flatnonzero(mask)]
     
     return results
 
@@ -396,14 +453,10 @@ def lookup_parts_batch(part_ids: List[str]) -> List[Dict]:
         List of part data dicts
     """
     
-    parts = []
-    
-    for part_id in part_ids:
-        part = lookup_part(part_id)
-        if part:
-            parts.append(part)
-    
-    return parts
+    # Pure in-memory lookups: no need for per-part lookup_part calls/logging
+    part_id_map = state["part_id_map"]
+    found = (part_id_map.get(part_id.upper().strip()) for part_id in part_ids)
+    return [part for part in found if part]
 
 
 def check_compatibility_batch(
@@ -421,12 +474,8 @@ def check_compatibility_batch(
         Dict mapping part_id → compatible (bool)
     """
     
-    results = {}
-    
-    for part_id in part_ids:
-        results[part_id] = check_compatibility(model_id, part_id)
-    
-    return results
+    compatible = get_model_part_sets().get(model_id.upper().strip(), frozenset())
+    return {part_id: part_id.upper().strip() in compatible for part_id in part_ids}
 
 
 # UTILITY: TEST EMBEDDING CONNECTION
@@ -490,14 +539,24 @@ def get_embedding_model_info(model_id: str = "amazon.titan-embed-text-v1") -> Di
     return info
 
 
-# AUTO-TEST ON IMPORT
+# STARTUP CHECK
 
-# Test embedding connection when module loads
-if bedrock_runtime and chroma_collection:
+def check_embedding_backend() -> bool:
+    """
+    Verify Bedrock embeddings and ChromaDB are usable
+    
+    Makes a live Bedrock call, so run it off the startup path (the app
+    lifespan starts it in a background thread).
+    """
+    
+    if not (bedrock_runtime and chroma_collection):
+        logger.warning("Bedrock or ChromaDB not initialized - some features disabled")
+        return False
+    
     logger.info("Testing Bedrock Titan embeddings...")
     if test_embedding_connection():
         logger.info("part_tools ready with Bedrock Titan embeddings")
-    else:
-        logger.warning("Embedding test failed - vector search may not work")
-else:
-    logger.warning("Bedrock or ChromaDB not initialized - some features disabled")
+        return True
+    
+    logger.warning("Embedding test failed - vector search may not work")
+    return False
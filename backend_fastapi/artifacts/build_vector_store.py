@@ -1,5 +1,5 @@
 import os
-import json
+import orjson
 import chromadb
 from tqdm import tqdm
 from typing import List, Optional
@@ -11,15 +11,20 @@ from app.embeddings.titan import TitanEmbedder
 # Helper: Build embedding text
 # ---------------------------------------------------
 
+LABELS = ("Part ID: ", "Title: ", "Brand: ", "Description: ", "Symptoms: ", "Appliance Type: ")
+
+
 def build_document_text(part: dict) -> str:
-    return f"""
-Part ID: {part.get('part_id')}
-Title: {part.get('title')}
-Brand: {part.get('brand')}
-Description: {part.get('description')}
-Symptoms: {", ".join(part.get('symptoms', []))}
-Appliance Type: {part.get('appliance_type')}
-"""
+    # Same text as the original multi-line template (keeps embeddings stable)
+    values = (
+        str(part.get('part_id')),
+        str(part.get('title')),
+        str(part.get('brand')),
+        str(part.get('description')),
+        ", ".join(part.get('symptoms') or ()),
+        str(part.get('appliance_type')),
+    )
+    return "\n" + "\n".join([label + value for label, value in zip(LABELS, values)]) + "\n"
 
 
 # ---------------------------------------------------
@@ -78,11 +83,11 @@ class VectorStore:
 # Build Vector Store (Run Once After Scraping)
 # ---------------------------------------------------
 
-def build_vector_store():
+def build_vector_store(batch_size: int = 32):
 
     print("Loading parts...")
-    with open(config.PART_ID_MAP_PATH, "r") as f:
-        parts = json.load(f)
+    with open(config.PART_ID_MAP_PATH, "rb") as f:
+        parts = orjson.loads(f.read())
 
     print(f"Loaded {len(parts)} parts")
 
@@ -100,22 +105,30 @@ def build_vector_store():
 
     print("Embedding and storing parts...")
 
-    for part_id, part in tqdm(parts.items()):
-
-        text = build_document_text(part)
-        embedding = embedder.embed(text)
-
-        metadata = {
-            "part_id": part_id,
-            "brand": part.get("brand") or "",
-            "appliance_type": part.get("appliance_type") or ""
-        }
-        collection.add(
-            ids=[part_id],
-            documents=[text],
-            embeddings=[embedding],
-            metadatas=[metadata]
-        )
+    items = list(parts.items())
+
+    with tqdm(total=len(items)) as progress:
+        for start in range(0, len(items), batch_size):
+            batch = items[start:start + batch_size]
+
+            texts = [build_document_text(part) for _, part in batch]
+            embeddings = embedder.embed_batch(texts)
+
+            metadatas = [
+                {
+                    "part_id": part_id,
+                    "brand": part.get("brand") or "",
+                    "appliance_type": part.get("appliance_type") or ""
+                }
+                for part_id, part in batch
+            ]
+            collection.add(
+                ids=[part_id for part_id, _ in batch],
+                documents=texts,
+                embeddings=embeddings,
+                metadatas=metadatas
+            )
+            progress.update(len(batch))
 
 print("Vector store built successfully.")
 
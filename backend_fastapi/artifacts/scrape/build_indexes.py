@@ -1,24 +1,36 @@
-import json
+import ijson
+import orjson
 import re
 from collections import defaultdict
+from functools import lru_cache
 from pathlib import Path
 
 INPUT_FILE = "artifacts/scrape/data/parts.json"
 OUTPUT_DIR = Path("artifacts/scrape/data")
 
+_NORM_RE = re.compile(r"[^A-Z0-9]")
+
+
+def write_json(path: Path, obj) -> None:
+    path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+
+
+# The same model string appears across many parts; normalize each once
+@lru_cache(maxsize=None)
 def normalize_model_id(model: str) -> str:
-    return re.sub(r"[^A-Z0-9]", "", model.strip().upper())
+    return _NORM_RE.sub("", model.strip().upper())
 
 
 def build_indexes(parts):
 
     part_id_map = {}
-    model_id_to_parts_map = defaultdict(list)
+    model_id_to_parts_map = defaultdict(set)
     model_metadata = {}
 
     for part in parts:
 
-        part_id = part["part_id"].upper()
+        # The scraper already emits canonical "PS" + digits IDs
+        part_id = part["part_id"]
         part_id_map[part_id] = part
 
         appliance_type = part.get("appliance_type")
@@ -26,7 +38,7 @@ def build_indexes(parts):
         for model in part.get("compatible_models", []):
             clean_model = normalize_model_id(model)
 
-            model_id_to_parts_map[clean_model].append(part_id)
+            model_id_to_parts_map[clean_model].add(part_id)
 
             # Only store metadata once
             if clean_model not in model_metadata:
@@ -34,9 +46,9 @@ def build_indexes(parts):
                     "appliance_type": appliance_type
                 }
 
-    # Deduplicate part lists
+    # Sets -> sorted lists (deterministic JSON output)
     model_id_to_parts_map = {
-        k: list(set(v)) for k, v in model_id_to_parts_map.items()
+        k: sorted(v) for k, v in model_id_to_parts_map.items()
     }
 
     return part_id_map, model_id_to_parts_map, model_metadata
@@ -44,19 +56,16 @@ def build_indexes(parts):
 
 def run():
 
-    with open(INPUT_FILE) as f:
-        parts = json.load(f)
-
-    part_id_map, model_map, metadata = build_indexes(parts)
-
-    with open(OUTPUT_DIR / "part_id_map.json", "w") as f:
-        json.dump(part_id_map, f, indent=2)
-
-    with open(OUTPUT_DIR / "model_id_to_parts_map.json", "w") as f:
-        json.dump(model_map, f, indent=2)
+    # Stream the parts array instead of loading the whole file up front;
+    # build_indexes only makes one pass. use_float keeps prices orjson-safe
+    # (ijson yields Decimal by default).
+    with open(INPUT_FILE, "rb") as f:
+        parts = ijson.items(f, "item", use_float=True)
+        part_id_map, model_map, metadata = build_indexes(parts)
 
-    with open(OUTPUT_DIR / "model_metadata.json", "w") as f:
-        json.dump(metadata, f, indent=2)
+    write_json(OUTPUT_DIR / "part_id_map.json", part_id_map)
+    write_json(OUTPUT_DIR / "model_id_to_parts_map.json", model_map)
+    write_json(OUTPUT_DIR / "model_metadata.json", metadata)
 
     print("Indexes built successfully.")
 
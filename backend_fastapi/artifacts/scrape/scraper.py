@@ -1,14 +1,16 @@
 import asyncio
-import json
+import orjson
 import os
 import random
 import re
 from collections import defaultdict
+from itertools import chain
 from playwright.async_api import async_playwright
-from bs4 import BeautifulSoup
+from selectolax.parser import HTMLParser
 from pathlib import Path
 
 BASE_URL = "https://www.partselect.com"
+MAX_PARALLEL_PAGES = 3
 OUTPUT_DIR = Path("artifacts/scrape/data")
 
 CATEGORY_URLS = {
@@ -16,27 +18,49 @@ CATEGORY_URLS = {
     "Dishwasher": f"{BASE_URL}/Dishwasher-Parts.htm",
 }
 
-async def collect_brand_pages(page, category_url, appliance_type):
-    brand_urls = []
+# Compiled once; these run for every link on every page
+_PART_HREF_RE = re.compile(r'/PS\d{5,}.*\.htm')
+_QUERY_RE = re.compile(r'\?.*$')
+_FRAGMENT_RE = re.compile(r'#.*$')
+_PS_ID_RE = re.compile(r'PS(\d+)')
+_PRICE_RE = re.compile(r'\$[\d,.]+')
+
+# Brand page patterns, one per appliance type
+_BRAND_RE_CACHE = {}
+
+
+def _brand_re(appliance_type):
+    pattern = _BRAND_RE_CACHE.get(appliance_type)
+    if pattern is None:
+        pattern = re.compile(rf'/[A-Za-z]+-{appliance_type}-Parts\.htm')
+        _BRAND_RE_CACHE[appliance_type] = pattern
+    return pattern
 
-    resp = await page.goto(category_url, wait_until="domcontentloaded")
-    if resp.status != 200:
-        return []
 
-    soup = BeautifulSoup(await page.content(), "html.parser")
+def collect_brand_pages_from_tree(tree, appliance_type):
+    brand_urls = []
+    seen = set()
 
-    pattern = rf'/[A-Za-z]+-{appliance_type}-Parts\.htm'
+    pattern = _brand_re(appliance_type)
+    # Literal every match must contain; cheap reject before the regex
+    marker = f"-{appliance_type}-Parts.htm"
 
-    for link in soup.find_all("a", href=True):
-        href = link["href"]
-        if re.search(pattern, href):
+    for link in tree.css("a[href]"):
+        href = link.attributes.get("href") or ""
+        if marker not in href:
+            continue
+        if pattern.search(href):
             full = href if href.startswith("http") else BASE_URL + href
-            if full not in brand_urls:
+            if full not in seen:
+                seen.add(full)
                 brand_urls.append(full)
 
     return brand_urls
 
 
+def write_json(path, obj):
+    path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS))
+
 
 async def random_delay(min_sec=2, max_sec=4):
     await asyncio.sleep(random.uniform(min_sec, max_sec))
@@ -58,50 +82,69 @@ async def create_browser(playwright):
         locale="en-US",
     )
 
-    page = await context.new_page()
-    await page.add_init_script(
+    # Context-level, so every page opened later gets it too
+    await context.add_init_script(
         'Object.defineProperty(navigator, "webdriver", {get: () => undefined});'
     )
+    page = await context.new_page()
 
     return browser, context, page
 
 
-async def collect_part_urls(page, url):
-    part_urls = []
+async def fetch_tree(page, url):
+    """Load url and parse it once; None if the page did not load"""
 
     resp = await page.goto(url, wait_until="domcontentloaded", timeout=30000)
     if resp.status != 200:
-        return []
+        return None
 
     await random_delay()
 
-    soup = BeautifulSoup(await page.content(), "html.parser")
+    return HTMLParser(await page.content())
+
 
-    for link in soup.find_all("a", href=True):
-        href = link["href"]
-        if re.search(r'/PS\d{5,}.*\.htm', href):
-            clean = re.sub(r'\?.*$', '', href)
-            clean = re.sub(r'#.*$', '', clean)
+def collect_part_urls_from_tree(tree):
+    part_urls = []
+    seen = set()
+
+    for link in tree.css("a[href]"):
+        href = link.attributes.get("href") or ""
+        # Most links are not part links; skip the regex for them
+        if "/PS" not in href:
+            continue
+        if _PART_HREF_RE.search(href):
+            clean = _QUERY_RE.sub('', href)
+            clean = _FRAGMENT_RE.sub('', clean)
             full = clean if clean.startswith("http") else BASE_URL + clean
-            if full not in part_urls:
+            if full not in seen:
+                seen.add(full)
                 part_urls.append(full)
 
     return part_urls
 
 
+async def collect_part_urls(page, url):
+    tree = await fetch_tree(page, url)
+    if tree is None:
+        return []
+
+    return collect_part_urls_from_tree(tree)
+
+
 async def scrape_part_page(page, url):
     try:
         resp = await page.goto(url, wait_until="domcontentloaded", timeout=30000)
         if resp.status != 200:
             return None
 
-        await random_delay()
+        # Short delay: pages are fetched concurrently, so this is per-page pacing
+        await random_delay(1, 2)
 
-        soup = BeautifulSoup(await page.content(), "html.parser")
+        tree = HTMLParser(await page.content())
 
         data = {}
 
-        ps_match = re.search(r'PS(\d+)', url)
+        ps_match = _PS_ID_RE.search(url)
         if not ps_match:
             return None
 
@@ -110,34 +153,34 @@ async def scrape_part_page(page, url):
         data["url"] = url
 
         # Title
-        title_el = soup.select_one("h1")
+        title_el = tree.css_first("h1")
         if title_el:
-            data["title"] = title_el.get_text(strip=True)
+            data["title"] = title_el.text(strip=True)
 
         # Description
-        desc_el = soup.select_one(".pd__description")
+        desc_el = tree.css_first(".pd__description")
         if desc_el:
-            data["description"] = desc_el.get_text(strip=True)[:1500]
+            data["description"] = desc_el.text(strip=True)[:1500]
 
         # Price
-        price_el = soup.select_one(".pd__price")
+        price_el = tree.css_first(".pd__price")
         if price_el:
-            price_match = re.search(r'\$[\d,.]+', price_el.get_text())
+            price_match = _PRICE_RE.search(price_el.text())
             if price_match:
                 data["price"] = price_match.group(0)
 
         # Availability
-        stock_el = soup.select_one(".pd__ships-today")
+        stock_el = tree.css_first(".pd__ships-today")
         data["availability"] = "In Stock" if stock_el else "Check site"
 
         # Compatible models
-        crossref = soup.select_one(".pd__crossref__list")
+        crossref = tree.css_first(".pd__crossref__list")
         if crossref:
-            model_links = crossref.find_all("a")
-            models = []
+            model_links = crossref.css("a")
+            models = set()
 
             for link in model_links:
-                model_text = link.get_text(strip=True)
+                model_text = link.text(strip=True)
 
                 # Clean and validate
                 if (
@@ -146,10 +189,11 @@ async def scrape_part_page(page, url):
                     and 6 <= len(model_text) <= 15
                     and not model_text.startswith(("REFRIG", "DISHWA"))
                 ):
-                    models.append(model_text.upper())
+                    models.add(model_text.upper())
 
             if models:
-                data["compatible_models"] = list(set(models))
+                # Sorted keeps the JSON output deterministic
+                data["compatible_models"] = sorted(models)
 
         return data
 
@@ -157,42 +201,79 @@ async def scrape_part_page(page, url):
         return None
 
 
+async def map_on_pages(pages, urls, fetch):
+    """Run fetch(page, url) for every url, one in flight per page; results keep URL order"""
+
+    idle_pages = asyncio.Queue()
+    for page in pages:
+        idle_pages.put_nowait(page)
+
+    async def run_one(url):
+        page = await idle_pages.get()
+        try:
+            return await fetch(page, url)
+        finally:
+            idle_pages.put_nowait(page)
+
+    return await asyncio.gather(*(run_one(url) for url in urls))
+
+
+async def scrape_part_pages(pages, urls):
+    """Scrape part pages concurrently across the page pool"""
+
+    positions = {url: i for i, url in enumerate(urls)}
+
+    async def scrape(page, url):
+        print(f"[{positions[url]+1}/{len(urls)}] {url}")
+        part_data = await scrape_part_page(page, url)
+        await random_delay(1, 2)
+        return part_data
+
+    return await map_on_pages(pages, urls, scrape)
+
+
 async def run(max_parts_per_category=500):
     os.makedirs("data", exist_ok=True)
 
     parts_list = []
     part_id_map = {}
-    model_to_parts_map = defaultdict(list)
-    model_id_to_parts_map = defaultdict(list)
+    model_to_parts_map = defaultdict(set)
+    model_id_to_parts_map = defaultdict(set)
     seen_ps = set()
 
     async with async_playwright() as p:
         browser, context, page = await create_browser(p)
+        pages = [page] + [await context.new_page() for _ in range(MAX_PARALLEL_PAGES - 1)]
 
         for appliance_type, category_url in CATEGORY_URLS.items():
             print(f"\nScraping {appliance_type}...")
 
-            part_urls = await collect_part_urls(page, category_url)
+            # One fetch + parse of the category page serves both link scans
+            category_tree = await fetch_tree(page, category_url)
+            if category_tree is None:
+                continue
+
+            brand_urls = collect_brand_pages_from_tree(category_tree, appliance_type)
+            brand_results = await map_on_pages(pages, brand_urls, collect_part_urls)
 
-            brand_urls = await collect_brand_pages(page, category_url, appliance_type)
-            for brand_url in brand_urls:
-                brand_parts = await collect_part_urls(page, brand_url)
-                for u in brand_parts:
-                    if u not in part_urls:
-                        part_urls.append(u)
+            # Ordered dedup in one pass: category links first, then each brand's
+            part_urls = list(dict.fromkeys(chain(
+                collect_part_urls_from_tree(category_tree), *brand_results
+            )))
 
             print(f"Collected {len(part_urls)} URLs")
 
             # part_urls = part_urls[:max_parts_per_category]
 
-            for i, url in enumerate(part_urls):
-                print(f"[{i+1}/{len(part_urls)}] {url}")
+            scraped = await scrape_part_pages(pages, part_urls)
 
-                part_data = await scrape_part_page(page, url)
+            # Merge sequentially (in URL order) so dedup stays deterministic
+            for part_data in scraped:
                 if not part_data:
                     continue
 
-                ps_id = part_data["part_id"].upper()
+                # Already canonical: scrape_part_page builds it as "PS" + digits
+                ps_id = part_data["part_id"]
                 if ps_id in seen_ps:
                     continue
 
@@ -202,46 +283,35 @@ async def run(max_parts_per_category=500):
                 parts_list.append(part_data)
                 part_id_map[ps_id] = part_data
 
-                models = part_data.get("compatible_models", [])
-                for model in models:
-                    clean_model = model.strip().upper()
+                # Model numbers are stripped and uppercased at scrape time
+                for model in part_data.get("compatible_models", []):
+                    model_to_parts_map[f"{model} {appliance_type}".lower()].add(ps_id)
+                    model_id_to_parts_map[model].add(ps_id)
 
-                    raw_key = f"{clean_model} {appliance_type}".lower()
-                    model_to_parts_map[raw_key].append(ps_id)
-                    model_id_to_parts_map[clean_model].append(ps_id)
+        await browser.close()
 
-                await random_delay()
+    # Check on the sets (one C-level difference per model), before sorting
+    all_part_ids = part_id_map.keys()
 
-        await browser.close()
+    for model, part_ids in model_id_to_parts_map.items():
+        unknown = part_ids - all_part_ids
+        if unknown:
+            raise ValueError(f"Invalid mapping: {model} -> {sorted(unknown)}")
+
+    print("Integrity check passed.")
 
-    # Remove duplicates
+    # Sets -> sorted lists for JSON
     model_to_parts_map = {
-        k: list(set(v)) for k, v in model_to_parts_map.items()
+        k: sorted(v) for k, v in model_to_parts_map.items()
     }
     model_id_to_parts_map = {
-        k: list(set(v)) for k, v in model_id_to_parts_map.items()
+        k: sorted(v) for k, v in model_id_to_parts_map.items()
     }
     
-    all_part_ids = set(part_id_map.keys())
-
-    for model, part_ids in model_id_to_parts_map.items():
-        for pid in part_ids:
-            if pid not in all_part_ids:
-                raise ValueError(f"Invalid mapping: {model} -> {pid}")
-
-    print("Integrity check passed.")
-
-    with open(OUTPUT_DIR / "parts.json", "w") as f:
-        json.dump(parts_list, f, indent=2)
-
-    with open(OUTPUT_DIR / "part_id_map.json", "w") as f:
-        json.dump(part_id_map, f, indent=2)
-
-    with open(OUTPUT_DIR / "model_to_parts_map.json", "w") as f:
-        json.dump(model_to_parts_map, f, indent=2)
-
-    with open(OUTPUT_DIR / "model_id_to_parts_map.json", "w") as f:
-        json.dump(model_id_to_parts_map, f, indent=2)
+    write_json(OUTPUT_DIR / "parts.json", parts_list)
+    write_json(OUTPUT_DIR / "part_id_map.json", part_id_map)
+    write_json(OUTPUT_DIR / "model_to_parts_map.json", model_to_parts_map)
+    write_json(OUTPUT_DIR / "model_id_to_parts_map.json", model_id_to_parts_map)
 
     print("\nIngestion complete.")
 
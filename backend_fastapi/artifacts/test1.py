@@ -14,15 +14,23 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pytest
 import json
+from functools import lru_cache
 from unittest.mock import Mock, patch
 from app.agent.router import ApplianceAgent, AgentResponse
 
 
+@lru_cache(maxsize=None)
+def shared_agent():
+    """One agent for the whole module; construction loads state and clients"""
+    return ApplianceAgent()
+
+
 class TestEdgeCases:
     """Test edge cases and unusual inputs"""
     
-    def setup_method(self):
-        self.agent = ApplianceAgent()
+    @classmethod
+    def setup_class(cls):
+        cls.agent = shared_agent()
     
     def test_empty_query(self):
         """Should handle empty query gracefully"""
@@ -63,8 +71,9 @@ class TestEdgeCases:
 class TestFailureScenarios:
     """Test failure scenarios and fallbacks"""
     
-    def setup_method(self):
-        self.agent = ApplianceAgent()
+    @classmethod
+    def setup_class(cls):
+        cls.agent = shared_agent()
     
     @patch('app.tools.part_tools.vector_search')
     def test_chromadb_timeout(self, mock_search):
@@ -106,8 +115,9 @@ class TestFailureScenarios:
 class TestConfidenceScoring:
     """Test confidence scoring accuracy"""
     
-    def setup_method(self):
-        self.agent = ApplianceAgent()
+    @classmethod
+    def setup_class(cls):
+        cls.agent = shared_agent()
     
     def test_high_confidence_with_valid_part(self):
         """Valid part ID should give high confidence"""
@@ -145,8 +155,9 @@ class TestConfidenceScoring:
 class TestGuardrails:
     """Test scope and safety guardrails"""
     
-    def setup_method(self):
-        self.agent = ApplianceAgent()
+    @classmethod
+    def setup_class(cls):
+        cls.agent = shared_agent()
     
     def test_out_of_scope_oven(self):
         """Should reject oven queries"""
@@ -189,8 +200,9 @@ class TestGuardrails:
 class TestGracefulDegradation:
     """Test graceful degradation with unvalidated data"""
     
-    def setup_method(self):
-        self.agent = ApplianceAgent()
+    @classmethod
+    def setup_class(cls):
+        cls.agent = shared_agent()
     
     def test_unvalidated_model_provides_recommendations(self):
         """Should provide recommendations even with unvalidated model"""
@@ -211,10 +223,12 @@ class TestGracefulDegradation:
 class TestMetrics:
     """Test metrics logging and analytics"""
     
-    def setup_method(self):
-        self.agent = ApplianceAgent()
-        
-        # Clear any existing metrics file
+    @classmethod
+    def setup_class(cls):
+        cls.agent = shared_agent()
+    
+    def setup_method(self, method):
+        # Each test starts from an empty metrics file
         import os
         if os.path.exists("metrics.jsonl"):
             os.remove("metrics.jsonl")
@@ -12,20 +12,23 @@ Outputs:
 
 from __future__ import annotations
 
+import asyncio
 import json
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from statistics import median
 from typing import Any, Dict, List, Tuple
 
-import requests
+import httpx
+import orjson
 
 
 BACKEND_URL = "http://127.0.0.1:8000"
 CHAT_ENDPOINT = "/chat"
 TIMEOUT_SECONDS = 45
+# Cases run concurrently, at most this many in flight against the backend
+MAX_CONCURRENT_CASES = 4
 
 
 @dataclass
@@ -72,14 +75,19 @@ EDGE_CASES: List[EvalCase] = [
 ]
 
 
-def run_case(session: requests.Session, case: EvalCase, conversation_id: str) -> Dict[str, Any]:
-    started = time.perf_counter()
-    response = session.post(
-        f"{BACKEND_URL}{CHAT_ENDPOINT}",
-        json={"conversation_id": conversation_id, "message": case.prompt},
-        timeout=TIMEOUT_SECONDS,
-    )
-    latency_ms = (time.perf_counter() - started) * 1000
+async def run_case(
+    client: httpx.AsyncClient,
+    limiter: asyncio.Semaphore,
+    case: EvalCase,
+    conversation_id: str,
+) -> Dict[str, Any]:
+    async with limiter:
+        started = time.perf_counter()
+        response = await client.post(
+            CHAT_ENDPOINT,
+            json={"conversation_id": conversation_id, "message": case.prompt},
+        )
+        latency_ms = (time.perf_counter() - started) * 1000
 
     if response.status_code != 200:
         return {
@@ -92,7 +100,7 @@ def run_case(session: requests.Session, case: EvalCase, conversation_id: str) ->
             "notes": f"HTTP {response.status_code}",
         }
 
-    payload = response.json()
+    payload = orjson.loads(response.content)
     agent = payload.get("response", {})
     response_type = agent.get("type")
 
@@ -123,20 +131,25 @@ def run_case(session: requests.Session, case: EvalCase, conversation_id: str) ->
 
 
 def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
-    latencies = [row["latency_ms"] for row in results]
     success_count = sum(1 for row in results if row["ok"])
 
-    sorted_lat = sorted(latencies)
-    p95_index = max(0, int(round(0.95 * len(sorted_lat))) - 1)
-    p95 = sorted_lat[p95_index]
+    # Sort once; both percentiles are read from the same list
+    sorted_lat = sorted(row["latency_ms"] for row in results)
+    n = len(sorted_lat)
+    if n:
+        mid = n // 2
+        p50 = sorted_lat[mid] if n % 2 else (sorted_lat[mid - 1] + sorted_lat[mid]) / 2
+        p95 = sorted_lat[max(0, int(round(0.95 * n)) - 1)]
+    else:
+        p50 = p95 = 0.0
 
     return {
         "total": len(results),
         "passed": success_count,
         "failed": len(results) - success_count,
         "pass_rate_pct": round((success_count / len(results)) * 100, 1) if results else 0.0,
-        "latency_p50_ms": round(median(latencies), 2) if latencies else 0.0,
-        "latency_p95_ms": round(p95, 2) if latencies else 0.0,
+        "latency_p50_ms": round(p50, 2),
+        "latency_p95_ms": round(p95, 2),
     }
 
 
@@ -189,16 +202,28 @@ Backend: `{BACKEND_URL}`
     return report_path
 
 
-def main() -> None:
-    session = requests.Session()
-    required_results: List[Dict[str, Any]] = []
-    edge_results: List[Dict[str, Any]] = []
+async def run_all() -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    limiter = asyncio.Semaphore(MAX_CONCURRENT_CASES)
+
+    async with httpx.AsyncClient(base_url=BACKEND_URL, timeout=TIMEOUT_SECONDS) as client:
+        # Each case has its own conversation_id, so they are independent;
+        # gather keeps results in case order for the report.
+        required_results, edge_results = await asyncio.gather(
+            asyncio.gather(*(
+                run_case(client, limiter, case, conversation_id=f"eval-required-{idx}")
+                for idx, case in enumerate(REQUIRED_CASES, start=1)
+            )),
+            asyncio.gather(*(
+                run_case(client, limiter, case, conversation_id=f"eval-edge-{idx}")
+                for idx, case in enumerate(EDGE_CASES, start=1)
+            )),
+        )
 
-    for idx, case in enumerate(REQUIRED_CASES, start=1):
-        required_results.append(run_case(session, case, conversation_id=f"eval-required-{idx}"))
+    return list(required_results), list(edge_results)
 
-    for idx, case in enumerate(EDGE_CASES, start=1):
-        edge_results.append(run_case(session, case, conversation_id=f"eval-edge-{idx}"))
+
+def main() -> None:
+    required_results, edge_results = asyncio.run(run_all())
 
     report_path = write_report(required_results, edge_results)
     print(json.dumps({"report": str(report_path)}, indent=2))
@@ -0,0 +1,17 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+cd "${ROOT_DIR}"
+
+# uvloop + httptools ship with uvicorn[standard]; access logging is off
+# because /chat already records per-query metrics.
+# Sessions and caches are per process: only raise WORKERS behind a load
+# balancer that pins each conversation_id to one worker.
+exec uvicorn app.main:app \
+  --host "${HOST:-0.0.0.0}" \
+  --port "${PORT:-8000}" \
+  --workers "${WORKERS:-1}" \
+  --loop uvloop \
+  --http httptools \
+  --no-access-log
@@ -1,6 +1,9 @@
+import copy
 import sys
 from pathlib import Path
-from types import ModuleType
+from types import MappingProxyType, ModuleType
+
+import pytest
 
 
 # Ensure `app` package resolves from backend_fastapi/
@@ -27,3 +30,62 @@ if "chromadb" not in sys.modules:
 
     chromadb_stub.PersistentClient = _FakeClient
     sys.modules["chromadb"] = chromadb_stub
+
+
+@pytest.fixture(scope="session")
+def agent():
+    """One ApplianceAgent for the whole run; tests patch it via monkeypatch only"""
+    from app.agent.router import ApplianceAgent
+
+    return ApplianceAgent()
+
+
+@pytest.fixture
+def handlers(agent):
+    return agent.handlers
+
+
+@pytest.fixture(scope="session")
+def _base_state():
+    """Catalog snapshot shared by the symptom tests, built once per session"""
+    return MappingProxyType({
+        "part_id_map": {
+            "PS11752778": {
+                "part_id": "PS11752778",
+                "title": "Dishwasher Drain Pump",
+                "brand": "Whirlpool",
+                "price": "$49.99",
+                "description": "Drains water from dishwasher tub.",
+                "symptoms": "not draining|standing water",
+                "url": "https://www.partselect.com/PS11752778",
+                "rating": "4.7",
+            },
+        },
+        "model_id_to_parts_map": {"WDT780SAEM1": ["PS11752778"]},
+    })
+
+
+@pytest.fixture
+def seeded_state(monkeypatch, _base_state):
+    """Install copies of the snapshot maps into state; restored after the test
+
+    Records are plain dicts, like the ones load_state produces, so code
+    under test sees production types and can't edit the shared snapshot.
+    """
+    from app.core.state import state
+
+    monkeypatch.setitem(
+        state, "part_id_map", {pid: dict(part) for pid, part in _base_state["part_id_map"].items()}
+    )
+    monkeypatch.setitem(state, "model_id_to_parts_map", copy.copy(_base_state["model_id_to_parts_map"]))
+    return state
+
+
+@pytest.fixture
+def make_part(_base_state):
+    """Build a part record from the shared catalog slice, e.g. make_part(similarity_score=0.8)"""
+
+    def _part(part_id: str = "PS11752778", **overrides):
+        return {**_base_state["part_id_map"][part_id], **overrides}
+
+    return _part
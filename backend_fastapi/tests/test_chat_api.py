@@ -46,3 +46,151 @@ def test_chat_endpoint_returns_500_on_agent_error(monkeypatch):
 
     assert response.status_code == 500
     assert "Injected failure" in response.json()["detail"]
+
+
+def test_sessions_evict_least_recently_used(monkeypatch):
+    monkeypatch.setattr(main_module, "sessions", main_module.OrderedDict())
+    monkeypatch.setattr(main_module.config, "SESSION_MAX_ENTRIES", 2)
+
+    first, _ = main_module.get_or_create_session(None)
+    second, _ = main_module.get_or_create_session(None)
+    main_module.get_or_create_session(first)
+    third, _ = main_module.get_or_create_session(None)
+
+    assert list(main_module.sessions) == [first, third]
+    assert second not in main_module.sessions
+
+
+def test_session_evicted_mid_request_keeps_the_turn(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(main_module, "sessions", main_module.OrderedDict())
+    monkeypatch.setattr(main_module.config, "SESSION_MAX_ENTRIES", 1)
+
+    def fake_handle_query(**kwargs):
+        # A concurrent request opens a session and evicts this one
+        main_module.get_or_create_session(None)
+        return AgentResponse(type="clarification_needed", confidence=0.2, requires_clarification=True)
+
+    monkeypatch.setattr(main_module.agent, "handle_query", fake_handle_query)
+
+    response = client.post("/chat", json={"message": "help"})
+
+    assert response.status_code == 200
+    conversation_id = response.json()["conversation_id"]
+    assert list(main_module.sessions) == [conversation_id]
+    assert main_module.sessions[conversation_id]["turn_count"] == 1
+
+
+def test_session_history_keeps_last_twenty_messages(monkeypatch):
+    client = TestClient(app)
+
+    monkeypatch.setattr(
+        main_module.agent,
+        "handle_query",
+        lambda **kwargs: AgentResponse(
+            type="clarification_needed",
+            confidence=0.2,
+            requires_clarification=True,
+            message=f"echo: {kwargs['user_query']}",
+        ),
+    )
+
+    conversation_id = client.post("/chat", json={"message": "turn 0"}).json()["conversation_id"]
+    for i in range(1, 12):
+        client.post("/chat", json={"conversation_id": conversation_id, "message": f"turn {i}"})
+
+    session = client.get(f"/session/{conversation_id}").json()
+
+    assert session["message_count"] == 20
+    assert len(session["messages"]) == 10
+    assert session["messages"][-1]["content"]["message"] == "echo: turn 11"
+
+    summary = main_module.build_conversation_summary(conversation_id)
+    assert summary.splitlines()[0] == "User: turn 9"
+    assert summary.splitlines()[-1] == "Assistant: echo: turn 11"
+
+
+def test_long_conversations_skip_summary_and_semantic_cache(monkeypatch):
+    from app.retrieval.semantic_cache import skip_semantic_cache
+
+    client = TestClient(app)
+    monkeypatch.setattr(main_module.config, "CONVERSATION_CACHE_THRESHOLD", 2)
+    seen = []
+
+    def fake_handle_query(**kwargs):
+        seen.append((kwargs["conversation_summary"], skip_semantic_cache.get()))
+        return AgentResponse(
+            type="clarification_needed",
+            confidence=0.2,
+            requires_clarification=True,
+            message="Which model do you have?",
+        )
+
+    monkeypatch.setattr(main_module.agent, "handle_query", fake_handle_query)
+
+    conversation_id = client.post("/chat", json={"message": "turn 0"}).json()["conversation_id"]
+    for i in range(1, 4):
+        client.post("/chat", json={"conversation_id": conversation_id, "message": f"turn {i}"})
+
+    assert seen[0] == ("", False)
+    assert seen[2][0] and seen[2][1] is False
+    assert seen[3] == ("", True)
+    assert skip_semantic_cache.get() is False
+
+
+def test_compact_history_shrinks_older_responses_only():
+    def turn(content):
+        return [
+            {"role": "user", "content": "question"},
+            {"role": "assistant", "content": content},
+        ]
+
+    long_explanation = "x" * 600
+    detailed = {
+        "type": "symptom_solution",
+        "explanation": long_explanation,
+        "recommended_parts": [{"part_id": "PS11752778", "title": "Door Shelf Bin"}],
+    }
+    clarification = {
+        "type": "clarification_needed",
+        "confidence": 0.3,
+        "requires_clarification": True,
+        "message": "Which model do you have?",
+        "clarification_questions": ["What is your model number?"],
+    }
+
+    messages = main_module.deque(
+        turn(detailed) + turn(detailed) + turn(clarification) + turn(clarification),
+        maxlen=20,
+    )
+    main_module.compact_history(messages)
+
+    # Next turn is 0: these are 4, 3, 2 and 1 turns ago
+    oldest, middle, older_clarification, last_clarification = [m["content"] for m in list(messages)[1::2]]
+    assert oldest["recommended_parts"] == ["PS11752778"]
+    assert oldest["explanation"] == long_explanation
+    assert middle["recommended_parts"][0]["title"] == "Door Shelf Bin"
+    assert "clarification_questions" not in older_clarification
+    assert older_clarification["message"] == "Which model do you have?"
+    assert last_clarification is clarification
+    assert detailed["recommended_parts"][0]["title"] == "Door Shelf Bin"
+
+    for _ in range(2):
+        messages.extend(turn(clarification))
+    main_module.compact_history(messages)
+    main_module.compact_history(messages)
+
+    truncated = list(messages)[1]["content"]["explanation"]
+    assert truncated == "x" * 500 + "[truncated]"
+
+
+def test_summary_arena_keeps_last_lines_and_reclaims_space(monkeypatch):
+    monkeypatch.setattr(main_module.SummaryArena, "COMPACT_BYTES", 64)
+    arena = main_module.SummaryArena(max_lines=3)
+
+    assert arena.render() == ""
+    for i in range(50):
+        arena.append(f"User: message {i} ✓")
+
+    assert arena.render() == "User: message 47 ✓\nUser: message 48 ✓\nUser: message 49 ✓"
+    assert len(arena.buffer) < 64 + 3 * 32
@@ -1,11 +1,9 @@
-from app.agent.handlers import AgentHandlers
+from app.agent import handlers as handlers_module
 from app.core.state import state
 
 
-def test_unknown_model_returns_likely_alternatives(monkeypatch):
-    handlers = AgentHandlers()
-
-    state["part_id_map"] = {
+def test_unknown_model_returns_likely_alternatives(handlers, monkeypatch):
+    monkeypatch.setitem(state, "part_id_map", {
         "PS11752778": {
             "part_id": "PS11752778",
             "title": "Dishwasher Dishrack Wheel Kit",
@@ -36,10 +34,11 @@ def test_unknown_model_returns_likely_alternatives(monkeypatch):
             "url": "https://www.partselect.com/PS10000002",
             "rating": "4.4",
         },
-    }
+    })
 
     monkeypatch.setattr(
-        "app.agent.handlers.vector_search",
+        handlers_module,
+        "vector_search",
         lambda *args, **kwargs: [
             {"part_id": "PS11752778", "similarity_score": 0.9},
             {"part_id": "PS10000001", "similarity_score": 0.8},
@@ -60,4 +59,9 @@ def test_unknown_model_returns_likely_alternatives(monkeypatch):
     assert response.requires_clarification is True
     assert response.compatible is None
     assert len(response.alternative_parts) == 2
-    assert "couldn't verify model" in (response.explanation or "").lower()
+    assert "couldn't verify model" in response.explanation_lower
+    assert "explanation_lower" not in response.model_dump()
+
+    response.explanation = "Model VERIFIED"
+    assert response.explanation_lower == "model verified"
+    assert response.model_copy(update={"explanation": "Other"}).explanation_lower == "other"
@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_preflight_echoes_origin_and_requested_headers():
+    client = TestClient(app)
+
+    response = client.options(
+        "/chat",
+        headers={
+            "Origin": "http://localhost:3000",
+            "Access-Control-Request-Method": "POST",
+            "Access-Control-Request-Headers": "content-type",
+        },
+    )
+
+    assert response.status_code == 204
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+    assert response.headers["access-control-allow-headers"] == "content-type"
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert "POST" in response.headers["access-control-allow-methods"]
+
+
+def test_simple_request_gets_wildcard_origin():
+    client = TestClient(app)
+
+    response = client.get("/", headers={"Origin": "http://localhost:3000"})
+
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == "*"
+    assert response.json()["status"] == "running"
+
+
+def test_request_without_origin_is_untouched():
+    client = TestClient(app)
+
+    response = client.get("/")
+
+    assert "access-control-allow-origin" not in response.headers
@@ -0,0 +1,59 @@
+import numpy as np
+
+from app.retrieval.dense_index import DenseIndex
+
+
+class _Collection:
+    def __init__(self, ids, embeddings):
+        self._data = {
+            "ids": ids,
+            "embeddings": embeddings,
+            "metadatas": [{"part_id": pid} for pid in ids],
+        }
+
+    def get(self, include):
+        return self._data
+
+
+def test_query_matches_brute_force_squared_l2():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(50, 16))
+    ids = [f"PS{i:08d}" for i in range(50)]
+    index = DenseIndex.from_collection(_Collection(ids, vectors.tolist()))
+
+    query = rng.normal(size=16)
+    metadatas, dists = index.query(query.tolist(), top_k=5)
+
+    expected = ((vectors - query) ** 2).sum(axis=1)
+    order = np.argsort(expected)[:5]
+    assert [m["part_id"] for m in metadatas] == [ids[i] for i in order]
+    np.testing.assert_allclose(dists, expected[order], rtol=1e-4)
+
+
+def test_top_k_larger_than_index_returns_everything_sorted():
+    index = DenseIndex(["PS1", "PS2"], [[0.0, 1.0], [1.0, 0.0]], [{"part_id": "PS1"}, {"part_id": "PS2"}])
+
+    metadatas, dists = index.query([1.0, 0.0], top_k=10)
+
+    assert [m["part_id"] for m in metadatas] == ["PS2", "PS1"]
+    assert dists.tolist() == [0.0, 2.0]
+
+
+def test_int8_index_shrinks_storage_and_keeps_ranking():
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(600, 64))  # spans several scoring blocks
+    ids = [f"PS{i:08d}" for i in range(600)]
+    metadatas = [{"part_id": pid} for pid in ids]
+    exact = DenseIndex(ids, vectors, metadatas)
+
+    # Queries near stored vectors, as with real near-duplicate part text
+    queries = vectors[:20] + rng.normal(scale=0.1, size=(20, 64))
+
+    index = DenseIndex(ids, vectors, metadatas, dtype="int8")
+    assert index.vectors.nbytes * 4 == exact.vectors.nbytes
+
+    for query in queries:
+        expected, expected_dists = exact.query(query.tolist(), top_k=1)
+        got, got_dists = index.query(query.tolist(), top_k=1)
+        assert got == expected
+        np.testing.assert_allclose(got_dists, expected_dists, rtol=0.05)
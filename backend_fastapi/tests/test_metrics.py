@@ -0,0 +1,94 @@
+import asyncio
+import contextlib
+import json
+
+from app.core.metrics import MetricsLogger
+
+
+def test_log_query_writes_one_compact_json_line(tmp_path):
+    metrics = MetricsLogger(log_file=str(tmp_path / "metrics.jsonl"))
+
+    metrics.log_query(
+        query="How can I install PS11752778?",
+        response_type="part_lookup",
+        confidence=0.9,
+        latency=0.25,
+        route="part_lookup",
+        intent="install_help",
+        entities={"part_id": "PS11752778", "model_id": None},
+    )
+
+    lines = (tmp_path / "metrics.jsonl").read_text().splitlines()
+    assert len(lines) == 1
+    assert ", " not in lines[0]
+
+    record = json.loads(lines[0])
+    assert record["route"] == "part_lookup"
+    assert record["latency_ms"] == 250.0
+    assert metrics.get_analytics()["total_queries"] == 1
+
+
+def test_background_writer_batches_and_flushes_records(tmp_path):
+    metrics = MetricsLogger(log_file=str(tmp_path / "metrics.jsonl"))
+
+    async def scenario():
+        writer = asyncio.create_task(metrics.run_writer(max_delay=0.01))
+        await asyncio.sleep(0)
+
+        for i in range(3):
+            metrics.log_query(
+                query=f"query {i}",
+                response_type="clarification_needed",
+                confidence=0.2,
+                latency=0.01,
+                route="low_signal",
+            )
+
+        await asyncio.sleep(0.05)
+        metrics.log_query(
+            query="late",
+            response_type="clarification_needed",
+            confidence=0.2,
+            latency=0.01,
+            route="low_signal",
+        )
+        writer.cancel()
+        # Handed off before the writer detaches, delivered after its final drain
+        metrics.log_query(
+            query="during shutdown",
+            response_type="clarification_needed",
+            confidence=0.2,
+            latency=0.01,
+            route="low_signal",
+        )
+        with contextlib.suppress(asyncio.CancelledError):
+            await writer
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+    lines = (tmp_path / "metrics.jsonl").read_text().splitlines()
+    assert len(lines) == 5
+    assert metrics._sink is None
+
+
+def test_atomic_counter_counts_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.core.metrics import AtomicCounter
+
+    counter = AtomicCounter()
+    assert counter.value == 0
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for _ in range(8):
+            executor.submit(lambda: [counter.increment() for _ in range(1000)])
+
+    assert counter.value == 8000
+
+    # Concurrent reads must not disturb each other
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        reads = list(executor.map(lambda _: counter.value, range(1000)))
+
+    assert set(reads) == {8000}
+    assert counter.value == 8000
@@ -0,0 +1,37 @@
+from app.tools import part_tools
+
+
+def test_search_by_symptom_filters_by_appliance_and_brand(monkeypatch):
+    results = [
+        {"part_id": "PS1", "product_types": "Refrigerator", "brand": "Whirlpool"},
+        {"part_id": "PS2", "product_types": "Dishwasher", "brand": "Whirlpool"},
+        {"part_id": "PS3", "product_types": "Refrigerator, Freezer", "brand": "GE"},
+        {"part_id": "PS4", "product_types": None, "brand": None},
+    ]
+    monkeypatch.setattr(part_tools, "vector_search", lambda query, top_k, embedding_model: results)
+
+    assert [p["part_id"] for p in part_tools.search_by_symptom("leaking", appliance="refrigerator")] == ["PS1", "PS3"]
+    assert [p["part_id"] for p in part_tools.search_by_symptom("leaking", appliance="refrigerator", brand="ge")] == ["PS3"]
+    assert part_tools.search_by_symptom("leaking") == results
+
+
+def test_parse_document_overlays_metadata_on_preloaded_part(monkeypatch):
+    from app.core.state import state
+
+    monkeypatch.setitem(
+        state,
+        "part_id_map",
+        {"PS11752778": {"part_id": "PS11752778", "title": "Door Shelf Bin", "appliance_type": "refrigerator"}},
+    )
+
+    part = part_tools._parse_document(
+        None, {"part_id": "PS11752778", "brand": "Whirlpool", "appliance_type": ""}
+    )
+
+    assert part == {
+        "part_id": "PS11752778",
+        "title": "Door Shelf Bin",
+        "appliance_type": "refrigerator",
+        "brand": "Whirlpool",
+    }
+    assert "brand" not in state["part_id_map"]["PS11752778"]
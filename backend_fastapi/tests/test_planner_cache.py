@@ -0,0 +1,26 @@
+from app.agent.planner import ClaudePlanner
+
+
+def test_cache_evicts_least_recently_used_within_byte_budget(monkeypatch):
+    planner = ClaudePlanner()
+    responses = iter(
+        '{"intent": "%s", "confidence": 0.9}' % intent
+        for intent in ("part_lookup", "install_help", "symptom_troubleshoot")
+    )
+    monkeypatch.setattr(planner, "_call_bedrock", lambda *args, **kwargs: next(responses))
+
+    planner.plan("first question")
+    entry_size = planner._cache_bytes
+    planner._cache_max_bytes = entry_size * 2 + 10
+
+    planner.plan("other question")
+    planner.plan("first question")  # hit: now most recently used
+    planner.plan("third question")  # evicts "other question"
+
+    stats = planner.cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["cache_size"] == 2
+    assert stats["cache_bytes"] <= planner._cache_max_bytes
+    assert stats["p95_time_saved_ms"] >= stats["avg_time_saved_ms"] >= 0
+    assert planner.plan("first question")["intent"] == "part_lookup"
@@ -1,19 +1,25 @@
 from app.agent.models import AgentResponse
-from app.agent.router import ApplianceAgent
+
+_CLARIFY_TYPES = frozenset({"clarification_needed", "model_required"})
 
 
 def _dummy_response(response_type: str) -> AgentResponse:
-    return AgentResponse(
+    # Trusted literals: skip validation
+    return AgentResponse.model_construct(
         type=response_type,
         confidence=0.8,
-        requires_clarification=response_type in {"clarification_needed", "model_required"},
+        requires_clarification=response_type in _CLARIFY_TYPES,
         message="ok",
     )
 
 
-def test_session_entities_not_reused_for_new_symptom_query():
-    agent = ApplianceAgent()
+# Built once; the patched handlers just hand back these references
+_COMPAT_OK = _dummy_response("compatibility")
+_ISSUE_REQUIRED = _dummy_response("issue_required")
+_SYMPTOM_OK = _dummy_response("symptom_solution")
+
 
+def test_session_entities_not_reused_for_new_symptom_query(agent):
     plan = {
         "intent": "symptom_troubleshoot",
         "confidence": 0.9,
@@ -34,9 +40,7 @@ def test_session_entities_not_reused_for_new_symptom_query():
     assert resolved["symptom"] == "Whirlpool refrigerator ice maker not working"
 
 
-def test_session_part_reused_only_with_explicit_reference():
-    agent = ApplianceAgent()
-
+def test_session_part_reused_only_with_explicit_reference(agent):
     plan = {
         "intent": "compatibility_check",
         "confidence": 0.9,
@@ -54,19 +58,12 @@ def test_session_part_reused_only_with_explicit_reference():
     assert resolved["part_id"] == "PS11752778"
 
 
-def test_compatibility_routing_uses_unvalidated_handler_for_unknown_model(monkeypatch):
-    agent = ApplianceAgent()
-    called = {"validated": False, "unvalidated": False}
-
-    monkeypatch.setattr(
-        agent.handlers,
-        "handle_compatibility",
-        lambda **kwargs: called.__setitem__("validated", True) or _dummy_response("compatibility"),
+def test_compatibility_routing_uses_unvalidated_handler_for_unknown_model(agent, mocker):
+    validated = mocker.patch.object(
+        agent.handlers, "handle_compatibility", autospec=True, return_value=_COMPAT_OK
     )
-    monkeypatch.setattr(
-        agent.handlers,
-        "handle_compatibility_unvalidated",
-        lambda **kwargs: called.__setitem__("unvalidated", True) or _dummy_response("compatibility"),
+    unvalidated = mocker.patch.object(
+        agent.handlers, "handle_compatibility_unvalidated", autospec=True, return_value=_COMPAT_OK
     )
 
     resolved = {
@@ -81,23 +78,16 @@ def test_compatibility_routing_uses_unvalidated_handler_for_unknown_model(monkey
     response = agent.route(resolved, {}, 0.8, "Is this part compatible with UNKNOWN123?")
 
     assert response.type == "compatibility"
-    assert called["unvalidated"] is True
-    assert called["validated"] is False
-
+    assert unvalidated.call_count == 1
+    assert validated.call_count == 0
 
-def test_compatibility_routing_uses_validated_handler_when_model_exists(monkeypatch):
-    agent = ApplianceAgent()
-    called = {"validated": False, "unvalidated": False}
 
-    monkeypatch.setattr(
-        agent.handlers,
-        "handle_compatibility",
-        lambda **kwargs: called.__setitem__("validated", True) or _dummy_response("compatibility"),
+def test_compatibility_routing_uses_validated_handler_when_model_exists(agent, mocker):
+    validated = mocker.patch.object(
+        agent.handlers, "handle_compatibility", autospec=True, return_value=_COMPAT_OK
     )
-    monkeypatch.setattr(
-        agent.handlers,
-        "handle_compatibility_unvalidated",
-        lambda **kwargs: called.__setitem__("unvalidated", True) or _dummy_response("compatibility"),
+    unvalidated = mocker.patch.object(
+        agent.handlers, "handle_compatibility_unvalidated", autospec=True, return_value=_COMPAT_OK
     )
 
     resolved = {
@@ -112,13 +102,11 @@ def test_compatibility_routing_uses_validated_handler_when_model_exists(monkeypa
     response = agent.route(resolved, {}, 0.8, "Is this part compatible with KNOWN123?")
 
     assert response.type == "compatibility"
-    assert called["validated"] is True
-    assert called["unvalidated"] is False
-
+    assert validated.call_count == 1
+    assert unvalidated.call_count == 0
 
-def test_symptom_intent_does_not_get_hijacked_by_compatibility(monkeypatch):
-    agent = ApplianceAgent()
 
+def test_symptom_intent_does_not_get_hijacked_by_compatibility(agent, monkeypatch):
     monkeypatch.setattr(
         agent.planner,
         "plan",
@@ -144,19 +132,12 @@ def test_symptom_intent_does_not_get_hijacked_by_compatibility(monkeypatch):
     assert response.type == "model_required"
 
 
-def test_model_only_followup_reuses_last_symptom(monkeypatch):
-    agent = ApplianceAgent()
-    called = {"issue_required": False, "symptom_unvalidated": False}
-
-    monkeypatch.setattr(
-        agent.handlers,
-        "handle_issue_required",
-        lambda **kwargs: called.__setitem__("issue_required", True) or _dummy_response("issue_required"),
+def test_model_only_followup_reuses_last_symptom(agent, mocker):
+    issue_required = mocker.patch.object(
+        agent.handlers, "handle_issue_required", autospec=True, return_value=_ISSUE_REQUIRED
     )
-    monkeypatch.setattr(
-        agent.handlers,
-        "handle_symptom_troubleshoot_unvalidated",
-        lambda **kwargs: called.__setitem__("symptom_unvalidated", True) or _dummy_response("symptom_solution"),
+    symptom_unvalidated = mocker.patch.object(
+        agent.handlers, "handle_symptom_troubleshoot_unvalidated", autospec=True, return_value=_SYMPTOM_OK
     )
 
     resolved = {
@@ -176,13 +157,11 @@ def test_model_only_followup_reuses_last_symptom(monkeypatch):
     response = agent.route(resolved, session, 0.59, "WRX735SDHZ08")
 
     assert response.type == "symptom_solution"
-    assert called["symptom_unvalidated"] is True
-    assert called["issue_required"] is False
+    assert symptom_unvalidated.call_count == 1
+    assert issue_required.call_count == 0
 
 
-def test_out_of_scope_query_returns_clarification(monkeypatch):
-    agent = ApplianceAgent()
-
+def test_out_of_scope_query_returns_clarification(agent, monkeypatch):
     monkeypatch.setattr(
         agent.planner,
         "plan",
@@ -209,20 +188,84 @@ def test_out_of_scope_query_returns_clarification(monkeypatch):
     assert "refrigerator and dishwasher" in (response.message or "").lower()
 
 
-def test_obvious_non_domain_query_bypasses_planner(monkeypatch):
-    agent = ApplianceAgent()
+def test_obvious_non_domain_query_bypasses_planner(agent, monkeypatch):
+    def _planner_should_not_run(_input):
+        raise AssertionError("planner.plan should not be called for obvious non-domain queries")
+
+    monkeypatch.setattr(agent.planner, "plan", _planner_should_not_run)
+
+    for _ in range(2):
+        response = agent.handle_query(
+            user_query="What is the capital of USA?",
+            conversation_id="c3",
+            conversation_summary="",
+            session_entities={},
+        )
+
+        assert response.type == "clarification_needed"
+        assert "refrigerator and dishwasher" in (response.message or "").lower()
+
+
+def test_fast_path_responses_are_not_shared_between_requests(agent, monkeypatch):
+    monkeypatch.setattr(
+        agent.planner,
+        "plan",
+        lambda _input: {"intent": "general_question", "confidence": 0.9, "appliance": "oven"},
+    )
+
+    for user_query in ("What is the capital of USA?", "My oven is not heating"):
+        first = agent.handle_query(user_query, "c6", "", {})
+        first.clarification_questions.append("edited")
+        first.explanation = "edited"
+
+        second = agent.handle_query(user_query, "c7", "", {})
+
+        assert second is not first
+        assert "edited" not in second.clarification_questions
+        assert second.explanation is None
 
+
+def test_long_non_domain_query_bypasses_planner(agent, monkeypatch):
     def _planner_should_not_run(_input):
         raise AssertionError("planner.plan should not be called for obvious non-domain queries")
 
     monkeypatch.setattr(agent.planner, "plan", _planner_should_not_run)
 
+    user_query = "I am planning a trip across Europe next spring. " * 20 + "What is the capital of France?"
     response = agent.handle_query(
-        user_query="What is the capital of USA?",
-        conversation_id="c3",
+        user_query=user_query,
+        conversation_id="c5",
         conversation_summary="",
         session_entities={},
     )
 
     assert response.type == "clarification_needed"
-    assert "refrigerator and dishwasher" in (response.message or "").lower()
+
+
+def test_repeated_query_is_planned_once(agent, monkeypatch):
+    from app.agent.planner import ClaudePlanner
+
+    planner = ClaudePlanner()
+    calls = []
+
+    def fake_bedrock(user_input, max_tokens=350):
+        calls.append(user_input)
+        return (
+            '{"intent": "general_question", "confidence": 0.9, "symptom": "oven not heating", '
+            '"appliance": "oven", "query": "oven not heating"}'
+        )
+
+    monkeypatch.setattr(planner, "_call_bedrock", fake_bedrock)
+    monkeypatch.setattr(agent, "planner", planner)
+
+    for user_query in ("My oven is not heating", "my oven  is not heating "):
+        response = agent.handle_query(
+            user_query=user_query,
+            conversation_id="c4",
+            conversation_summary="",
+            session_entities={},
+        )
+        assert response.type == "clarification_needed"
+
+    assert len(calls) == 1
+    assert planner.cache_stats()["hits"] == 1
@@ -0,0 +1,28 @@
+from app.retrieval.semantic_cache import SemanticCache
+
+
+def test_near_duplicate_query_hits_and_fifo_evicts():
+    cache = SemanticCache(max_entries=2, threshold=0.97)
+    model = "amazon.titan-embed-text-v1"
+
+    cache.put("ice maker not working", [1.0, 0.0, 0.0], 10, model, [{"part_id": "PS11752778"}])
+    hit = cache.get("ice maker broken", [0.99, 0.05, 0.0], 5, model)
+    assert hit == [{"part_id": "PS11752778"}]
+
+    # Returned dicts are copies, so callers can annotate them freely
+    hit[0]["similarity_score"] = 0.9
+    assert "similarity_score" not in cache.get("ice maker broken", [1.0, 0.0, 0.0], 5, model)[0]
+
+    assert cache.get("door seal torn", [0.0, 1.0, 0.0], 5, model) is None
+    assert cache.get("ice maker broken", [1.0, 0.0, 0.0], 20, model) is None
+
+    cache.put("door seal torn", [0.0, 1.0, 0.0], 10, model, [{"part_id": "PS1"}])
+    cache.put("water filter", [0.0, 0.0, 1.0], 10, model, [{"part_id": "PS2"}])
+    assert cache.get("ice maker broken", [1.0, 0.0, 0.0], 5, model) is None
+    assert cache.get("water filter", [0.0, 0.0, 1.0], 5, model) == [{"part_id": "PS2"}]
+
+
+def test_long_queries_bypass_cache():
+    cache = SemanticCache(max_query_chars=10)
+    cache.put("x" * 11, [1.0, 0.0], 5, "m", [{"part_id": "PS1"}])
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,46 @@
+from app.core.state import compact_catalog, state, model_exists, part_exists
+
+
+def test_id_sets_follow_replaced_maps(monkeypatch):
+    monkeypatch.setitem(state, "part_id_map", {"PS11752778": {"part_id": "PS11752778"}})
+    monkeypatch.setitem(state, "model_id_to_parts_map", {"WDT780SAEM1": ["PS11752778"]})
+
+    assert part_exists("ps11752778")
+    assert model_exists("wdt780saem1")
+    assert not part_exists("PS00000000")
+
+    monkeypatch.setitem(state, "part_id_map", {})
+
+    assert not part_exists("PS11752778")
+
+
+def test_compatibility_uses_model_part_sets(monkeypatch):
+    from app.tools.part_tools import check_compatibility, check_compatibility_batch
+
+    monkeypatch.setitem(state, "model_id_to_parts_map", {"WDT780SAEM1": ["PS11752778", "PS3406971"]})
+
+    assert check_compatibility("wdt780saem1", "ps11752778")
+    assert check_compatibility_batch("WDT780SAEM1", ["PS3406971", "PS00000000"]) == {
+        "PS3406971": True,
+        "PS00000000": False,
+    }
+    assert check_compatibility_batch("UNKNOWN", ["PS3406971"]) == {"PS3406971": False}
+
+
+def test_compact_catalog_shares_id_strings():
+    part_id_map = {
+        "PS11752778": {
+            "part_id": "PS11752778",
+            "availability": "In Stock",
+            "compatible_models": ["WDT780SAEM1"],
+        },
+    }
+    model_map = {"".join(["WDT780", "SAEM1"]): ["".join(["PS1175", "2778"])]}
+
+    parts, models = compact_catalog(part_id_map, model_map)
+
+    part = parts["PS11752778"]
+    assert part["compatible_models"] == ("WDT780SAEM1",)
+    model_id = next(iter(models))
+    assert part["compatible_models"][0] is model_id
+    assert models[model_id][0] is part["part_id"]
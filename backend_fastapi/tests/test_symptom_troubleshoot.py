@@ -1,38 +1,10 @@
-from app.agent.handlers import AgentHandlers
+from app.agent import handlers as handlers_module
 from app.core.state import state
 
 
-def test_validated_symptom_flow_uses_llm_generation(monkeypatch):
-    handlers = AgentHandlers()
-
-    state["model_id_to_parts_map"] = {"WDT780SAEM1": ["PS11752778"]}
-    state["part_id_map"] = {
-        "PS11752778": {
-            "part_id": "PS11752778",
-            "title": "Dishwasher Drain Pump",
-            "brand": "Whirlpool",
-            "price": "$49.99",
-            "description": "Drains water from dishwasher tub.",
-            "symptoms": "not draining|standing water",
-            "url": "https://www.partselect.com/PS11752778",
-            "rating": "4.7",
-        }
-    }
-
+def test_validated_symptom_flow_uses_llm_generation(handlers, seeded_state, make_part, monkeypatch):
     def fake_vector_search(query, top_k=20):
-        return [
-            {
-                "part_id": "PS11752778",
-                "title": "Dishwasher Drain Pump",
-                "brand": "Whirlpool",
-                "price": "$49.99",
-                "description": "Drains water from dishwasher tub.",
-                "symptoms": "not draining|standing water",
-                "url": "https://www.partselect.com/PS11752778",
-                "rating": "4.7",
-                "similarity_score": 0.82,
-            }
-        ]
+        return [make_part(similarity_score=0.82)]
 
     captured = {}
 
@@ -47,7 +19,7 @@ def test_validated_symptom_flow_uses_llm_generation(monkeypatch):
             "tips": ["Disconnect power before servicing."],
         }
 
-    monkeypatch.setattr("app.agent.handlers.vector_search", fake_vector_search)
+    monkeypatch.setattr(handlers_module, "vector_search", fake_vector_search)
     monkeypatch.setattr(handlers, "_generate_diagnostic_response", fake_generate)
 
     response = handlers.handle_symptom_troubleshoot(
@@ -67,38 +39,11 @@ def test_validated_symptom_flow_uses_llm_generation(monkeypatch):
     assert captured["recommended_parts"][0]["part_id"] == "PS11752778"
 
 
-def test_validated_symptom_flow_falls_back_when_llm_generation_fails(monkeypatch):
-    handlers = AgentHandlers()
-
-    state["model_id_to_parts_map"] = {"WDT780SAEM1": ["PS11752778"]}
-    state["part_id_map"] = {
-        "PS11752778": {
-            "part_id": "PS11752778",
-            "title": "Dishwasher Drain Pump",
-            "brand": "Whirlpool",
-            "price": "$49.99",
-            "description": "Drains water from dishwasher tub.",
-            "symptoms": "not draining|standing water",
-            "url": "https://www.partselect.com/PS11752778",
-            "rating": "4.7",
-        }
-    }
-
+def test_validated_symptom_flow_falls_back_when_llm_generation_fails(handlers, seeded_state, make_part, monkeypatch):
     monkeypatch.setattr(
-        "app.agent.handlers.vector_search",
-        lambda *args, **kwargs: [
-            {
-                "part_id": "PS11752778",
-                "title": "Dishwasher Drain Pump",
-                "brand": "Whirlpool",
-                "price": "$49.99",
-                "description": "Drains water from dishwasher tub.",
-                "symptoms": "not draining|standing water",
-                "url": "https://www.partselect.com/PS11752778",
-                "rating": "4.7",
-                "similarity_score": 0.81,
-            }
-        ],
+        handlers_module,
+        "vector_search",
+        lambda *args, **kwargs: [make_part(similarity_score=0.81)],
     )
 
     def raises(*args, **kwargs):
@@ -117,3 +62,62 @@ def test_validated_symptom_flow_falls_back_when_llm_generation_fails(monkeypatch
     assert response.type == "symptom_solution"
     assert response.recommended_parts
     assert response.explanation == "Based on your symptom, here are recommended parts:"
+
+
+def test_popular_parts_fallback_filters_by_appliance_and_sorts_by_rating(handlers, monkeypatch):
+    monkeypatch.setitem(
+        state,
+        "part_id_map",
+        {
+            "PS1000001": {"part_id": "PS1000001", "product_types": "Dishwasher", "rating": "4.1"},
+            "PS1000002": {"part_id": "PS1000002", "product_types": "Refrigerator", "rating": "4.9"},
+            "PS1000003": {"part_id": "PS1000003", "product_types": "Dishwasher", "rating": "N/A"},
+            "PS1000004": {"part_id": "PS1000004", "product_types": "Dishwasher", "rating": "4.8"},
+        },
+    )
+
+    popular = handlers._get_popular_parts("dishwasher", limit=2)
+
+    assert [p["part_id"] for p in popular] == ["PS1000004", "PS1000001"]
+    assert all(p["similarity_score"] == 0.5 for p in popular)
+    assert "similarity_score" not in state["part_id_map"]["PS1000004"]
+
+    fallback = handlers._get_popular_parts("oven", limit=2)
+
+    assert [p["part_id"] for p in fallback] == ["PS1000002", "PS1000001"]
+    assert all(p["similarity_score"] == 0.4 for p in fallback)
+
+
+def test_unvalidated_symptom_flow_searches_broadly_only_on_a_miss(handlers, seeded_state, make_part, monkeypatch):
+    results = {"dishwasher common parts": [make_part(similarity_score=0.7)]}
+    searched = []
+
+    def fake_vector_search(query, top_k=10):
+        searched.append(query)
+        return results.get(query, [])
+
+    monkeypatch.setattr(handlers_module, "vector_search", fake_vector_search)
+    monkeypatch.setattr(handlers, "_generate_diagnostic_response", lambda **kwargs: {"explanation": "Check the pump."})
+
+    def run():
+        return handlers.handle_symptom_troubleshoot_unvalidated(
+            symptom="dishwasher not draining",
+            model_id="UNKNOWN123",
+            session_entities={"appliance": "dishwasher"},
+            confidence=0.6,
+            user_query="My dishwasher is not draining, model UNKNOWN123",
+        )
+
+    response = run()
+
+    assert len(searched) == 2
+    assert searched[1] == "dishwasher common parts"
+    assert response.type == "symptom_solution"
+    assert [p.part_id for p in response.recommended_parts] == ["PS11752778"]
+
+    # Primary hit: the broad fallback is never searched
+    results[searched[0]] = [make_part(similarity_score=0.8)]
+    searched.clear()
+    run()
+
+    assert len(searched) == 1
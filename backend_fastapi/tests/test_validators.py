@@ -0,0 +1,24 @@
+import re
+
+from app.agent.validators import contains_word
+
+
+def test_contains_word_matches_word_boundary_regex():
+    from app.agent.router import ApplianceAgent
+
+    queries = [
+        "my oven is not heating",
+        "orange range hood",
+        "the stove-top burner",
+        "ac unit leaking",
+        "my washing machine won't spin",
+        "accessories for my fridge",
+        "microwaves",
+        "range",
+        "",
+    ]
+
+    for query in queries:
+        for keyword in ApplianceAgent.OUT_OF_SCOPE_KEYWORDS:
+            expected = bool(re.search(r"\b" + re.escape(keyword) + r"\b", query))
+            assert contains_word(query, keyword) is expected, (query, keyword)